@@ -0,0 +1,130 @@
+"""Admission control for application submissions: bounded concurrency, a short wait queue and latency-based shedding.
+
+At most max_concurrency submissions run the agent pipeline at once. Others wait in FIFO order for a slot, up to
+max_queued of them and for at most queue_timeout seconds; past that they get 429 (queue full) or 503 (timed out).
+While the p99 latency of recent submissions is above target_p99_ms, or the wait a newcomer could expect already
+is, nobody new is queued: submissions that cannot start at once are shed with 503 right away. Every rejection
+carries a Retry-After estimate. Dashboard reads never pass through here, so bursts of writes are refused instead
+of slowing everyone down.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+
+from metrics import ADMISSION_QUEUED, ADMISSION_REJECTED, ADMISSION_WAIT_SECONDS
+
+# Completed submissions between p99 recomputations over the latency window
+_P99_EVERY = 20
+
+
+class Rejected(Exception):
+    """Raised by AdmissionController.acquire() when a submission is not admitted."""
+
+    def __init__(self, status_code, reason, retry_after):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(self, max_concurrency=32, max_queued=128, queue_timeout=10.0, target_p99_ms=2000.0, window=500):
+        self.max_concurrency = max_concurrency
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.target_p99 = target_p99_ms / 1000
+        self.active = 0
+        self._waiters = deque()
+        # End-to-end seconds (wait included) of the most recent admitted submissions
+        self._latencies = deque(maxlen=window)
+        self._until_p99 = _P99_EVERY
+        self.p99 = 0.0
+        self.mean = 0.0
+
+        self.admitted = 0
+        self.queued_total = 0
+        self.rejected = {"queue_full": 0, "overloaded": 0, "timeout": 0}
+
+    @property
+    def waiting(self):
+        return len(self._waiters)
+
+    @property
+    def overloaded(self):
+        return self.target_p99 > 0 and self.p99 > self.target_p99
+
+    async def acquire(self, endpoint):
+        """Wait for a pipeline slot and return the admission start time for release(); raises Rejected."""
+        started = time.perf_counter()
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return started
+        if self.overloaded or self.target_p99 and self.expected_wait() > self.target_p99:
+            raise self._reject(endpoint, "overloaded", 503)
+        if len(self._waiters) >= self.max_queued:
+            raise self._reject(endpoint, "queue_full", 429)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued_total += 1
+        ADMISSION_QUEUED.inc(endpoint)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended; pass it on
+                self._hand_over()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise self._reject(endpoint, "timeout", 503)
+        ADMISSION_WAIT_SECONDS.labels(endpoint).observe(time.perf_counter() - started)
+        return started
+
+    def release(self, started):
+        """Free the slot taken by acquire() and record the submission's latency."""
+        self._latencies.append(time.perf_counter() - started)
+        self._until_p99 -= 1
+        if self._until_p99 <= 0:
+            self._until_p99 = _P99_EVERY
+            latencies = sorted(self._latencies)
+            self.p99 = latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]
+            self.mean = sum(latencies) / len(latencies)
+        self._hand_over()
+
+    def _hand_over(self):
+        # The slot goes straight to the oldest live waiter, so active only drops when nobody is waiting
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self.admitted += 1
+                return
+        self.active -= 1
+
+    def expected_wait(self):
+        """Seconds until a submission queued now would get a slot: the ones ahead drained through the slots."""
+        return self.mean * (len(self._waiters) + 1) / max(self.max_concurrency, 1)
+
+    def _reject(self, endpoint, reason, status_code):
+        self.rejected[reason] += 1
+        ADMISSION_REJECTED.inc(endpoint, reason)
+        seconds = self.expected_wait() if reason == "queue_full" else max(self.p99, self.expected_wait())
+        return Rejected(status_code, reason, max(1, math.ceil(seconds)))
+
+    def stats(self):
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queued": self.max_queued,
+            "target_p99_ms": self.target_p99 * 1000,
+            "active": self.active,
+            "waiting": self.waiting,
+            "p99_ms": round(self.p99 * 1000, 3),
+            "overloaded": self.overloaded,
+            "admitted": self.admitted,
+            "queued": self.queued_total,
+            "rejected": dict(self.rejected),
+        }
@@ -0,0 +1,171 @@
+"""Array-backed export of the soft-voting loan ensemble and a vectorized NumPy evaluator for it.
+
+The sklearn VotingClassifier (RandomForest + GradientBoosting + scaled LogisticRegression) spends most of its
+time on input validation and Python dispatch across 200 tree objects. Here every tree is flattened into
+contiguous node arrays and the StandardScaler is folded into the logistic regression coefficients, so a batch
+is scored with a handful of NumPy operations.
+
+Regenerate the export for an existing model with: python -m agents.compiled_model
+"""
+import os
+import numpy as np
+
+FORMAT_VERSION = 1
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_JOBLIB_PATH = os.path.join(PROJECT_DIR, "loan_model.joblib")
+DEFAULT_COMPILED_PATH = os.path.join(PROJECT_DIR, "loan_model_compiled.npz")
+
+
+def _flatten_trees(trees, leaf_value):
+    """Concatenate fitted sklearn trees into flat node arrays.
+
+    Leaves point to themselves on both sides, so walking every tree for max_depth steps always lands on a leaf.
+    """
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        t = tree.tree_
+        n = t.node_count
+        idx = np.arange(n) + offset
+        is_leaf = t.children_left == -1
+
+        features.append(np.where(is_leaf, 0, t.feature))
+        thresholds.append(np.where(is_leaf, 0.0, t.threshold))
+        lefts.append(np.where(is_leaf, idx, t.children_left + offset))
+        rights.append(np.where(is_leaf, idx, t.children_right + offset))
+        values.append(leaf_value(t))
+        roots.append(offset)
+        offset += n
+
+    return {
+        "feature": np.concatenate(features).astype(np.intp),
+        "threshold": np.concatenate(thresholds).astype(np.float64),
+        "left": np.concatenate(lefts).astype(np.intp),
+        "right": np.concatenate(rights).astype(np.intp),
+        "value": np.concatenate(values).astype(np.float64),
+        "roots": np.asarray(roots, dtype=np.intp),
+        "depth": max(tree.tree_.max_depth for tree in trees),
+    }
+
+
+def ensemble_arrays(model, feature_names=None):
+    """Flat arrays of the fitted VotingClassifier from train_model.py, as stored in the .npz export.
+
+    feature_names is needed for a model whose recorded names load_model() already dropped.
+    """
+    rf, gb, lr_pipeline = (model.named_estimators_[name] for name in ("rf", "gb", "lr"))
+    scaler, lr = lr_pipeline.named_steps["scaler"], lr_pipeline.named_steps["lr"]
+    feature_names = model.feature_names_in_ if feature_names is None else feature_names
+    n_features = len(feature_names)
+
+    # Random forest: average of per-tree class-1 fractions
+    def class_one_fraction(t):
+        value = t.value[:, 0, :]
+        return value[:, 1] / value.sum(axis=1)
+    forest = _flatten_trees(rf.estimators_, class_one_fraction)
+
+    # Gradient boosting: init log-odds plus learning-rate-scaled regression tree outputs
+    boosting = _flatten_trees(gb.estimators_[:, 0], lambda t: t.value[:, 0, 0] * gb.learning_rate)
+    gb_init = float(gb._raw_predict_init(np.zeros((1, n_features), dtype=np.float32))[0, 0])
+
+    # Logistic regression with the StandardScaler folded into the coefficients
+    coef = lr.coef_[0] / scaler.scale_
+    intercept = float(lr.intercept_[0] - np.dot(coef, scaler.mean_))
+
+    weights = np.ones(3) if model.weights is None else np.asarray(model.weights, dtype=np.float64)
+
+    arrays = {
+        "format_version": np.asarray(FORMAT_VERSION),
+        "feature_names": np.asarray(feature_names, dtype=str),
+        "classes": np.asarray(model.classes_),
+        "weights": weights / weights.sum(),
+        "gb_init": np.asarray(gb_init),
+        "lr_coef": coef.astype(np.float64),
+        "lr_intercept": np.asarray(intercept),
+        # Training means, the reference point for the logistic regression's share of explanations (explainer.py)
+        "feature_means": scaler.mean_.astype(np.float64),
+    }
+    for prefix, trees in (("rf", forest), ("gb", boosting)):
+        for key, value in trees.items():
+            arrays[f"{prefix}_{key}"] = np.asarray(value)
+    return arrays
+
+
+def export_ensemble(model, path=DEFAULT_COMPILED_PATH):
+    """Write the fitted VotingClassifier from train_model.py to a compact .npz file."""
+    np.savez_compressed(path, **ensemble_arrays(model))
+    return path
+
+
+# Rows evaluated per traversal pass; keeps the (rows, trees) index arrays cache-sized for large batches
+_CHUNK_ROWS = 256
+
+
+class _TreeGroup:
+    def __init__(self, data, prefix):
+        self.feature = data[f"{prefix}_feature"]
+        self.threshold = data[f"{prefix}_threshold"]
+        # children[2 * node] is the left child, children[2 * node + 1] the right one
+        self.children = np.stack([data[f"{prefix}_left"], data[f"{prefix}_right"]], axis=1).ravel()
+        self.value = data[f"{prefix}_value"]
+        self.roots = data[f"{prefix}_roots"]
+        self.depth = int(data[f"{prefix}_depth"])
+
+    def leaf_values(self, X):
+        """Return the (n_rows, n_trees) matrix of leaf values reached by each row in each tree."""
+        out = np.empty((X.shape[0], self.roots.size))
+        for start in range(0, X.shape[0], _CHUNK_ROWS):
+            chunk = X[start:start + _CHUNK_ROWS]
+            flat = chunk.ravel()
+            row_offset = (np.arange(chunk.shape[0]) * chunk.shape[1])[:, None]
+            node = np.broadcast_to(self.roots, (chunk.shape[0], self.roots.size))
+            for _ in range(self.depth):
+                go_right = flat[row_offset + self.feature[node]] > self.threshold[node]
+                node = self.children[2 * node + go_right]
+            out[start:start + _CHUNK_ROWS] = self.value[node]
+        return out
+
+
+class CompiledEnsemble:
+    """Vectorized evaluator for the .npz export; a drop-in for the ensemble's predict_proba / classes_."""
+
+    def __init__(self, data):
+        if int(data["format_version"]) != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled model format: {int(data['format_version'])}")
+        self.feature_names = [str(name) for name in data["feature_names"]]
+        self.classes_ = data["classes"]
+        self.weights = data["weights"]
+        self.forest = _TreeGroup(data, "rf")
+        self.boosting = _TreeGroup(data, "gb")
+        self.gb_init = float(data["gb_init"])
+        self.lr_coef = data["lr_coef"]
+        self.lr_intercept = float(data["lr_intercept"])
+        # Missing from exports written before explanations existed
+        self.feature_means = data.get("feature_means")
+
+    @classmethod
+    def load(cls, path=DEFAULT_COMPILED_PATH):
+        with np.load(path) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        # sklearn trees split on float32 inputs, so round the same way before comparing
+        X_tree = X.astype(np.float32).astype(np.float64)
+
+        p_rf = self.forest.leaf_values(X_tree).mean(axis=1)
+        p_gb = 1.0 / (1.0 + np.exp(-(self.gb_init + self.boosting.leaf_values(X_tree).sum(axis=1))))
+        p_lr = 1.0 / (1.0 + np.exp(-(X @ self.lr_coef + self.lr_intercept)))
+
+        w_rf, w_gb, w_lr = self.weights
+        p_approve = w_rf * p_rf + w_gb * p_gb + w_lr * p_lr
+        return np.column_stack([1.0 - p_approve, p_approve])
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+if __name__ == "__main__":
+    import joblib
+    print(f"Exported to {export_ensemble(joblib.load(DEFAULT_JOBLIB_PATH))}")
@@ -0,0 +1,111 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+
+
+def model_fingerprint(path):
+    """Short content hash identifying a model file version."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+class DecisionCache:
+    """Bounded LRU + TTL cache of model scores keyed on (model fingerprint, feature tuple).
+
+    The watched model file is stat()ed at most every check_interval seconds; when it changes the
+    whole cache is dropped so no score from an older model outlives it.
+    """
+
+    def __init__(self, max_size=10000, ttl_seconds=3600.0, check_interval=5.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.check_interval = check_interval
+        self.fingerprint = None
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._model_path = None
+        self._file_signature = None
+        self._last_check = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def set_model(self, fingerprint, model_path):
+        """Bind the cache to the model currently used for scoring."""
+        if fingerprint != self.fingerprint:
+            self.clear()
+        self.fingerprint = fingerprint
+        self._model_path = model_path
+        self._file_signature = self._signature()
+        self._last_check = time.monotonic()
+
+    def _signature(self):
+        try:
+            st = os.stat(self._model_path)
+        except (OSError, TypeError):
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _check_model_file(self, now):
+        if self._model_path is None or now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        signature = self._signature()
+        if signature != self._file_signature:
+            self._file_signature = signature
+            self.invalidations += 1
+            self.clear()
+
+    def _key(self, features):
+        # Normalize so 700 and 700.0 (form ints vs batch floats) share an entry
+        return (self.fingerprint, tuple(float(value) for value in features))
+
+    def get(self, features):
+        now = time.monotonic()
+        self._check_model_file(now)
+        key = self._key(features)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, features, value):
+        key = self._key(features)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "model_fingerprint": self.fingerprint,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,100 @@
+"""Per-feature explanations of the ensemble's approval probability from tree path contributions.
+
+Along the path a row takes through a tree, every change in node value is credited to the feature split on at
+that step, so a row's contributions plus the tree's root value add up to its leaf value. The value change of
+every node is computed once per model version, and explaining a batch is one vectorized walk over the flat node
+arrays from compiled_model.py. Gradient boosting and the logistic regression add up in log-odds; their
+contributions are rescaled onto probabilities, so the contributions of all three members sum exactly to the
+ensemble's approval probability minus base_value.
+"""
+import numpy as np
+
+from agents.compiled_model import CompiledEnsemble, ensemble_arrays
+
+# Rows explained per pass, like compiled_model's traversal
+_CHUNK_ROWS = 256
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+class _PathContributions:
+    """Node value deltas of one tree group (compiled_model._TreeGroup), precomputed for path attribution."""
+
+    def __init__(self, group):
+        self.group = group
+        # Value change when stepping to children[i]; leaves point to themselves, so steps past a leaf add nothing
+        parents = np.repeat(np.arange(group.value.size), 2)
+        self.child_delta = group.value[group.children] - group.value[parents]
+        self.root_total = float(group.value[group.roots].sum())
+
+    def contributions(self, X):
+        """(n_rows, n_features) value changes credited to each feature, summed over the group's trees."""
+        g = self.group
+        out = np.zeros(X.shape)
+        for start in range(0, X.shape[0], _CHUNK_ROWS):
+            chunk = X[start:start + _CHUNK_ROWS]
+            n, n_features = chunk.shape
+            flat = chunk.ravel()
+            row_offset = (np.arange(n) * n_features)[:, None]
+            node = np.broadcast_to(g.roots, (n, g.roots.size))
+            for _ in range(g.depth):
+                cell = row_offset + g.feature[node]
+                step = 2 * node + (flat[cell] > g.threshold[node])
+                out[start:start + n] += np.bincount(
+                    cell.ravel(), weights=self.child_delta[step].ravel(), minlength=n * n_features
+                ).reshape(n, n_features)
+                node = g.children[step]
+        return out
+
+
+def _log_odds_to_probability(contributions, bias):
+    """Rescale log-odds contributions so they sum to sigmoid(bias + their total) - sigmoid(bias)."""
+    total = contributions.sum(axis=1)
+    base = _sigmoid(bias)
+    moved = np.abs(total) > 1e-12
+    # Secant slope of the sigmoid between base and the row; its derivative where the row sits at the base
+    slope = np.where(moved, (_sigmoid(bias + total) - base) / np.where(moved, total, 1.0), base * (1.0 - base))
+    return contributions * slope[:, None]
+
+
+class TreeExplainer:
+    """Explains approval probabilities of one model version; build it once when the version is loaded."""
+
+    def __init__(self, ensemble):
+        self.feature_names = ensemble.feature_names
+        self.weights = ensemble.weights
+        self.forest = _PathContributions(ensemble.forest)
+        self.boosting = _PathContributions(ensemble.boosting)
+        self.n_forest_trees = ensemble.forest.roots.size
+        self.gb_bias = ensemble.gb_init + self.boosting.root_total
+        self.lr_coef = ensemble.lr_coef
+        # Without training means (exports older than explanations) the logistic regression share is left unexplained
+        self.lr_reference = ensemble.feature_means
+        self.lr_bias = float(np.dot(self.lr_coef, self.lr_reference)) + ensemble.lr_intercept \
+            if self.lr_reference is not None else None
+
+        w_rf, w_gb, w_lr = self.weights
+        self.base_value = w_rf * self.forest.root_total / self.n_forest_trees + w_gb * _sigmoid(self.gb_bias)
+        if self.lr_bias is not None:
+            self.base_value += w_lr * _sigmoid(self.lr_bias)
+
+    @classmethod
+    def for_model(cls, model, feature_names):
+        """Explainer for a loaded model: the compiled export as is, or the sklearn ensemble flattened in memory."""
+        if not isinstance(model, CompiledEnsemble):
+            model = CompiledEnsemble(ensemble_arrays(model, feature_names))
+        return cls(model)
+
+    def explain(self, X):
+        """(n_rows, n_features) contributions of each feature to the approval probability (0-1 scale)."""
+        X = np.asarray(X, dtype=np.float64)
+        # Trees compare float32 inputs, as in CompiledEnsemble.predict_proba
+        X_tree = X.astype(np.float32).astype(np.float64)
+        w_rf, w_gb, w_lr = self.weights
+        out = w_rf * self.forest.contributions(X_tree) / self.n_forest_trees
+        out += w_gb * _log_odds_to_probability(self.boosting.contributions(X_tree), self.gb_bias)
+        if self.lr_bias is not None:
+            out += w_lr * _log_odds_to_probability(self.lr_coef * (X - self.lr_reference), self.lr_bias)
+        return out
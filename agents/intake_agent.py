@@ -1,3 +1,16 @@
+import numpy as np
+
+# Financial fields and how each is coerced (mirrors process() below)
+FINANCIAL_FIELDS = [
+    ("annual_income", float),
+    ("loan_amount", float),
+    ("credit_score", int),
+    ("employment_status", int),
+    ("housing_status", int),
+    ("loan_term", int),
+]
+APPLICANT_FIELDS = ["first_name", "last_name", "email"]
+
 class IntakeAgent:
     """Agent responsible for ingesting and structuring raw loan application data."""
     
@@ -20,3 +33,57 @@ class IntakeAgent:
             }
         }
         return structured_data
+
+    async def process_batch(self, records: list):
+        """Structure a batch of raw applications into columnar NumPy arrays.
+
+        Unlike the form endpoint every field is required; records that are missing fields, carry non-text applicant
+        fields or non-numeric, boolean or non-finite ("nan", 1e400) financials get an entry in "errors" and NaN
+        financials.
+        """
+        n = len(records)
+        errors = [None] * n
+
+        for i, record in enumerate(records):
+            if not isinstance(record, dict):
+                errors[i] = "Application must be a JSON object."
+                continue
+            missing = [name for name in APPLICANT_FIELDS + [f for f, _ in FINANCIAL_FIELDS] if record.get(name) in (None, "")]
+            if missing:
+                errors[i] = f"Missing required fields: {', '.join(missing)}"
+                continue
+            # Applicant fields are stored as given, so anything but text would only fail later, in the bulk INSERT
+            wrong_type = [name for name in APPLICANT_FIELDS if not isinstance(record[name], str)]
+            # JSON true / false would otherwise be scored as 1 / 0
+            wrong_type += [name for name, _ in FINANCIAL_FIELDS if isinstance(record[name], bool)]
+            if wrong_type:
+                errors[i] = f"Invalid value type for fields: {', '.join(wrong_type)}"
+
+        financials = {}
+        for name, cast in FINANCIAL_FIELDS:
+            column = [record.get(name) if error is None else np.nan for record, error in zip(records, errors)]
+            try:
+                values = np.asarray(column, dtype=np.float64)
+            except (TypeError, ValueError):
+                # Fall back to per-row conversion to pinpoint the bad records
+                values = np.full(n, np.nan)
+                for i, value in enumerate(column):
+                    try:
+                        values[i] = float(value)
+                    except (TypeError, ValueError):
+                        errors[i] = errors[i] or f"Invalid value for {name}: {value!r}"
+            # float() accepts "nan", "inf" and overflowing numbers; none of them can be validated or scored
+            for i in np.flatnonzero(~np.isfinite(values)):
+                errors[i] = errors[i] or f"Invalid value for {name}: {column[i]!r}"
+            # Integer fields are truncated the same way int() does in process()
+            financials[name] = np.trunc(values) if cast is int else values
+
+        applicants = [
+            {name: record.get(name) for name in APPLICANT_FIELDS} if isinstance(record, dict) else {}
+            for record in records
+        ]
+        return {
+            "applicants": applicants,
+            "financials": financials,
+            "errors": errors
+        }
@@ -0,0 +1,158 @@
+"""Versioned store of trained Decision Agent models.
+
+Layout of the registry directory (config.MODEL_REGISTRY_DIR):
+
+    CURRENT                         name of the version the API should serve
+    <version>/metadata.json         version, sha256, accuracy, trained_at and file names
+    <version>/loan_model.joblib
+    <version>/loan_model_compiled.npz
+
+train_model.py registers and activates every model it trains. Without a CURRENT pointer the Decision Agent falls
+back to the loan_model.joblib / loan_model_compiled.npz pair in the project root as an "unversioned" model.
+
+Manage versions with:
+    python -m agents.model_registry list
+    python -m agents.model_registry activate <version>
+    python -m agents.model_registry register loan_model.joblib [--compiled loan_model_compiled.npz] [--accuracy 0.93]
+"""
+import argparse
+import datetime
+import json
+import os
+import shutil
+
+import config
+from agents.compiled_model import DEFAULT_COMPILED_PATH, DEFAULT_JOBLIB_PATH
+from agents.decision_cache import model_fingerprint
+
+MODEL_FILE = "loan_model.joblib"
+COMPILED_FILE = "loan_model_compiled.npz"
+METADATA_FILE = "metadata.json"
+CURRENT_FILE = "CURRENT"
+
+
+def _write_atomic(path, text):
+    # Readers (other workers, the file watcher) only ever see the old or the new content
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class ModelRegistry:
+    def __init__(self, root=config.MODEL_REGISTRY_DIR, fallback_model=DEFAULT_JOBLIB_PATH,
+                 fallback_compiled=DEFAULT_COMPILED_PATH):
+        self.root = root
+        self.fallback_model = fallback_model
+        self.fallback_compiled = fallback_compiled
+
+    def current(self):
+        """Name of the active version, or None when the registry has not been used yet."""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def versions(self):
+        found = []
+        if os.path.isdir(self.root):
+            for name in os.listdir(self.root):
+                if os.path.exists(os.path.join(self.root, name, METADATA_FILE)):
+                    found.append(self.metadata(name))
+        return sorted(found, key=lambda m: m["trained_at"] or "")
+
+    def metadata(self, version):
+        """Metadata of a registered version with absolute file paths; KeyError if it does not exist."""
+        directory = os.path.join(self.root, version)
+        try:
+            with open(os.path.join(directory, METADATA_FILE)) as f:
+                metadata = json.load(f)
+        except FileNotFoundError:
+            raise KeyError(f"Unknown model version: {version}") from None
+        metadata["model_path"] = os.path.join(directory, metadata["model_file"])
+        metadata["compiled_path"] = os.path.join(directory, metadata["compiled_file"]) if metadata.get("compiled_file") else None
+        return metadata
+
+    def resolve(self, version=None):
+        """Metadata of the given version, else the active one, else the unversioned model in the project root."""
+        version = version or self.current()
+        if version:
+            return self.metadata(version)
+        sha256 = model_fingerprint(self.fallback_model)
+        trained_at = datetime.datetime.fromtimestamp(os.path.getmtime(self.fallback_model)).isoformat(timespec="seconds")
+        return {
+            "version": f"unversioned-{sha256[:8]}",
+            "sha256": sha256,
+            "accuracy": None,
+            "trained_at": trained_at,
+            "model_path": self.fallback_model,
+            "compiled_path": self.fallback_compiled if os.path.exists(self.fallback_compiled) else None,
+        }
+
+    def signature(self):
+        """Cheap value that changes whenever resolve() would return a different model."""
+        current = self.current()
+        if current:
+            return current
+        try:
+            st = os.stat(self.fallback_model)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def register(self, model_path, compiled_path=None, accuracy=None, trained_at=None, activate=True, **extra):
+        """Copy a trained model (and its compiled export) into a new version directory."""
+        trained_at = trained_at or datetime.datetime.now()
+        sha256 = model_fingerprint(model_path)
+        version = f"{trained_at:%Y%m%d-%H%M%S}-{sha256[:8]}"
+        directory = os.path.join(self.root, version)
+        os.makedirs(directory, exist_ok=True)
+
+        shutil.copy2(model_path, os.path.join(directory, MODEL_FILE))
+        if compiled_path:
+            shutil.copy2(compiled_path, os.path.join(directory, COMPILED_FILE))
+        metadata = {
+            "version": version,
+            "sha256": sha256,
+            "accuracy": accuracy,
+            "trained_at": trained_at.isoformat(timespec="seconds"),
+            "model_file": MODEL_FILE,
+            "compiled_file": COMPILED_FILE if compiled_path else None,
+            **extra,
+        }
+        _write_atomic(os.path.join(directory, METADATA_FILE), json.dumps(metadata, indent=2))
+        if activate:
+            self.activate(version)
+        return self.metadata(version)
+
+    def activate(self, version):
+        self.metadata(version)  # raises KeyError for unknown versions
+        _write_atomic(os.path.join(self.root, CURRENT_FILE), version + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage versioned Decision Agent models.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List registered versions")
+    activate = commands.add_parser("activate", help="Point CURRENT at a version; running servers pick it up")
+    activate.add_argument("version")
+    register = commands.add_parser("register", help="Add a trained model file as a new version")
+    register.add_argument("model_path")
+    register.add_argument("--compiled", help="Matching compiled .npz export")
+    register.add_argument("--accuracy", type=float)
+    register.add_argument("--no-activate", action="store_true")
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    if args.command == "list":
+        current = registry.current()
+        for metadata in registry.versions():
+            marker = "*" if metadata["version"] == current else " "
+            print(f"{marker} {metadata['version']}  accuracy={metadata['accuracy']}  trained_at={metadata['trained_at']}")
+    elif args.command == "activate":
+        registry.activate(args.version)
+        print(f"Activated {args.version}")
+    else:
+        metadata = registry.register(args.model_path, args.compiled, accuracy=args.accuracy, activate=not args.no_activate)
+        print(f"Registered {metadata['version']}")
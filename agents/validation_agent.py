@@ -1,3 +1,14 @@
+import numpy as np
+
+VALID_LOAN_TERMS = [12, 36, 60]
+VALID_EMPLOYMENT_STATUSES = [0, 1, 2]
+
+INVALID_INCOME = "Annual income must be a valid positive amount."
+INVALID_LOAN_AMOUNT = "Requested loan amount must be positive."
+INVALID_LOAN_TERM = "Invalid loan term selected."
+INVALID_EMPLOYMENT = "Invalid employment status."
+ALL_VALID = "All data and documents validated successfully."
+
 class ValidationAgent:
     """Agent responsible for scrutinizing the data and documents."""
     
@@ -9,21 +20,56 @@ class ValidationAgent:
         
         if financials.get("annual_income", 0) <= 0:
             is_valid = False
-            remarks.append("Annual income must be a valid positive amount.")
+            remarks.append(INVALID_INCOME)
             
         if financials.get("loan_amount", 0) <= 0:
             is_valid = False
-            remarks.append("Requested loan amount must be positive.")
+            remarks.append(INVALID_LOAN_AMOUNT)
             
-        if financials.get("loan_term") not in [12, 36, 60]:
+        if financials.get("loan_term") not in VALID_LOAN_TERMS:
             is_valid = False
-            remarks.append("Invalid loan term selected.")
+            remarks.append(INVALID_LOAN_TERM)
             
-        if financials.get("employment_status") not in [0, 1, 2]:
+        if financials.get("employment_status") not in VALID_EMPLOYMENT_STATUSES:
             is_valid = False
-            remarks.append("Invalid employment status.")
+            remarks.append(INVALID_EMPLOYMENT)
             
         return {
             "is_valid": is_valid,
-            "remarks": " | ".join(remarks) if remarks else "All data and documents validated successfully."
+            "remarks": " | ".join(remarks) if remarks else ALL_VALID
         }
+
+    async def validate_batch(self, intake_batch: dict):
+        """Apply the same rules as validate() to a columnar batch with NumPy masks."""
+        is_valid, remarks = check_columns(intake_batch["financials"])
+
+        # Records the Intake Agent could not structure are rejected with its error
+        for i, error in enumerate(intake_batch["errors"]):
+            if error is not None:
+                is_valid[i] = False
+                remarks[i] = error
+
+        return {
+            "is_valid": is_valid,
+            "remarks": remarks
+        }
+
+
+def check_columns(financials):
+    """Vectorized validation rules over column arrays; returns (is_valid mask, remarks list)."""
+    checks = [
+        (np.asarray(financials["annual_income"]) <= 0, INVALID_INCOME),
+        (np.asarray(financials["loan_amount"]) <= 0, INVALID_LOAN_AMOUNT),
+        (~np.isin(financials["loan_term"], VALID_LOAN_TERMS), INVALID_LOAN_TERM),
+        (~np.isin(financials["employment_status"], VALID_EMPLOYMENT_STATUSES), INVALID_EMPLOYMENT),
+    ]
+
+    failed = np.zeros(len(checks[0][0]), dtype=bool)
+    for mask, _ in checks:
+        failed |= mask
+
+    remarks = [ALL_VALID] * len(failed)
+    for i in np.flatnonzero(failed):
+        remarks[i] = " | ".join(message for mask, message in checks if mask[i])
+
+    return ~failed, remarks
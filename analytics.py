@@ -0,0 +1,175 @@
+"""Portfolio analytics served from the application_rollup table instead of scanning applications.
+
+Every finalized application adds one to a fixed set of (dimension, bucket) counters in the same transaction that
+finalizes it, so a report reads a few dozen rows however large the portfolio grows.
+
+Rebuild the rollup from the applications table (e.g. after migrate_collapse_duplicates.py or a restore):
+    python analytics.py rebuild
+"""
+import argparse
+from collections import defaultdict
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+import models
+
+COUNTERS = ("applications", "approved", "rejected", "errors", "scored", "confidence_sum")
+
+# (upper bound exclusive, label), checked in order
+CREDIT_SCORE_BANDS = [(580, "300-579"), (670, "580-669"), (740, "670-739"), (800, "740-799"), (float("inf"), "800-850")]
+DTI_BUCKETS = [(0.2, "<20%"), (0.3, "20-30%"), (0.4, "30-40%"), (0.5, "40-50%"), (0.6, "50-60%"), (float("inf"), ">=60%")]
+EMPLOYMENT_LABELS = {0: "Unemployed", 1: "Self-Employed", 2: "Employed"}
+HOUSING_LABELS = {0: "Rent", 1: "Mortgage", 2: "Own"}
+
+# Report order of each dimension's buckets
+DIMENSIONS = {
+    "credit_score_band": [label for _, label in CREDIT_SCORE_BANDS],
+    "dti_bucket": [label for _, label in DTI_BUCKETS],
+    "employment_status": list(EMPLOYMENT_LABELS.values()),
+    "housing_status": list(HOUSING_LABELS.values()),
+    "loan_term": ["12", "24", "36", "48", "60"],
+}
+
+
+def _band(value, bands):
+    return next(label for bound, label in bands if value < bound)
+
+
+def buckets(app):
+    """(dimension, bucket) pairs an application counts towards."""
+    safe_income = float(app.annual_income) if app.annual_income and float(app.annual_income) > 0 else 1.0
+    dti = float(app.loan_amount or 0) / safe_income
+    return [
+        ("overall", "all"),
+        ("credit_score_band", _band(app.credit_score or 0, CREDIT_SCORE_BANDS)),
+        ("dti_bucket", _band(dti, DTI_BUCKETS)),
+        ("employment_status", EMPLOYMENT_LABELS.get(app.employment_status, str(app.employment_status))),
+        ("housing_status", HOUSING_LABELS.get(app.housing_status, str(app.housing_status))),
+        ("loan_term", str(app.loan_term)),
+    ]
+
+
+def increments(applications):
+    """Counter deltas per (dimension, bucket) for a batch of finalized applications."""
+    totals = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for app in applications:
+        scored = app.status in ("Approved", "Rejected") and (app.confidence or 0) > 0
+        for key in buckets(app):
+            counters = totals[key]
+            counters["applications"] += 1
+            counters["approved"] += app.status == "Approved"
+            counters["rejected"] += app.status == "Rejected"
+            counters["errors"] += app.status == "Error"
+            counters["scored"] += scored
+            counters["confidence_sum"] += app.confidence if scored else 0.0
+    return [{"dimension": dimension, "bucket": bucket, **counters} for (dimension, bucket), counters in totals.items()]
+
+
+def _unsupported(dialect_name):
+    return ValueError(f"application_rollup does not support the {dialect_name!r} database "
+                      "(expected sqlite, postgresql, mysql or mariadb)")
+
+
+def _upsert(dialect_name):
+    """INSERT of rollup increments that adds to existing (dimension, bucket) rows, in the database's own syntax."""
+    if dialect_name in ("sqlite", "postgresql"):
+        statement = (sqlite if dialect_name == "sqlite" else postgresql).insert(models.ApplicationRollup)
+        return statement.on_conflict_do_update(
+            index_elements=["dimension", "bucket"],
+            set_={name: getattr(models.ApplicationRollup, name) + statement.excluded[name] for name in COUNTERS}
+        )
+    if dialect_name in ("mysql", "mariadb"):
+        statement = mysql.insert(models.ApplicationRollup)
+        return statement.on_duplicate_key_update(
+            {name: getattr(models.ApplicationRollup, name) + statement.inserted[name] for name in COUNTERS}
+        )
+    raise _unsupported(dialect_name)
+
+
+def _lock_rollup(db):
+    """Block rollup upserts until the caller's transaction ends; applications finalized meanwhile wait with them."""
+    dialect_name = db.get_bind().dialect.name
+    table = models.ApplicationRollup.__tablename__
+    if dialect_name == "postgresql":
+        # Conflicts with the ROW EXCLUSIVE lock every upsert takes, but not with plain reads of the report
+        db.execute(text(f"LOCK TABLE {table} IN EXCLUSIVE MODE"))
+    elif dialect_name in ("mysql", "mariadb"):
+        # Locks every rollup row and the gaps between them (InnoDB next-key locks), so no upsert gets through
+        db.execute(text(f"SELECT dimension FROM {table} FOR UPDATE"))
+    elif dialect_name == "sqlite":
+        # The DELETE in rebuild() takes the database write lock, which every upsert needs
+        pass
+    else:
+        raise _unsupported(dialect_name)
+
+
+async def record(db, applications):
+    """Add finalized applications to the rollup. Runs inside the caller's transaction, commit included there."""
+    rows = increments(applications)
+    if rows:
+        await db.execute(_upsert(db.get_bind().dialect.name), rows)
+
+
+async def report(db):
+    """Approval rate and average confidence per bucket of every dimension, read from the rollup only."""
+    result = await db.execute(select(models.ApplicationRollup))
+    by_dimension = defaultdict(dict)
+    for row in result.scalars():
+        decided = row.approved + row.rejected
+        by_dimension[row.dimension][row.bucket] = {
+            "bucket": row.bucket,
+            "applications": row.applications,
+            "approved": row.approved,
+            "rejected": row.rejected,
+            "errors": row.errors,
+            "approval_rate": round(row.approved / decided, 4) if decided else None,
+            "avg_confidence": round(row.confidence_sum / row.scored, 2) if row.scored else None,
+        }
+
+    overall = by_dimension.pop("overall", {}).get("all")
+    report = {"overall": overall}
+    for dimension, order in DIMENSIONS.items():
+        found = by_dimension.get(dimension, {})
+        # Known buckets in report order, then any unexpected values (e.g. a loan term outside the form's options)
+        report[dimension] = [found.pop(bucket) for bucket in order if bucket in found] + list(found.values())
+    return report
+
+
+def rebuild(db, chunk_size=10000):
+    """Recompute the rollup from every finalized application (blocking session), in one transaction.
+
+    The rollup is locked before the scan, so an application finalized concurrently is either seen by the scan or
+    upserted after the rebuilt rows are committed, never both or neither.
+    """
+    _lock_rollup(db)
+    db.execute(delete(models.ApplicationRollup))
+    totals = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    # Only the columns the buckets need, streamed in chunks
+    columns = [getattr(models.Application, name) for name in (
+        "status", "confidence", "credit_score", "annual_income", "loan_amount", "employment_status", "housing_status",
+        "loan_term"
+    )]
+    query = select(*columns).where(models.Application.status != models.PROCESSING).execution_options(yield_per=chunk_size)
+    for partition in db.execute(query).partitions():
+        for row in increments(partition):
+            counters = totals[(row["dimension"], row["bucket"])]
+            for name in COUNTERS:
+                counters[name] += row[name]
+
+    rows = [{"dimension": dimension, "bucket": bucket, **counters} for (dimension, bucket), counters in totals.items()]
+    if rows:
+        db.execute(insert(models.ApplicationRollup), rows)
+    db.commit()
+    return totals.get(("overall", "all"), {}).get("applications", 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the application_rollup analytics table.")
+    parser.add_argument("command", choices=["rebuild"])
+    args = parser.parse_args()
+
+    from database import Base, SessionLocal, engine
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        print(f"Rollup rebuilt from {rebuild(db)} finalized applications.")
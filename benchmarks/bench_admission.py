@@ -0,0 +1,63 @@
+"""Submission bursts with and without admission control (admission.py).
+
+A Poisson burst above what the server can decide is sent with a client-side cap high enough that nothing holds
+it back, while dashboards poll the feed. Without admission control every submission is accepted and latency grows
+for everyone; with it, submissions beyond the slots and queue are shed with 429/503 and Retry-After, admitted ones
+stay near the latency target and the dashboard reads keep their own database pool. Each run uses its own process
+and scratch database, since the settings are read at import time.
+
+    python -m benchmarks.bench_admission --rate 60 --duration 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    "unlimited": {"APPLY_MAX_CONCURRENCY": "0"},
+    "admission": {"APPLY_MAX_CONCURRENCY": "64", "APPLY_MAX_QUEUED": "64", "APPLY_TARGET_P99_MS": "1000"},
+    "admission+retry": {"APPLY_MAX_CONCURRENCY": "64", "APPLY_MAX_QUEUED": "64", "APPLY_TARGET_P99_MS": "1000"},
+}
+
+
+def run_profile(name, args):
+    command = [
+        sys.executable, "-m", "benchmarks.load_test", "--uvicorn", "--rate", str(args.rate), "--duration", str(args.duration),
+        "--concurrency", "100000", "--pollers", str(args.pollers), "--poll-interval", str(args.poll_interval),
+        "--max-retries", "3" if name.endswith("+retry") else "0", "--json",
+    ]
+    output = subprocess.run(
+        command, cwd=PROJECT_DIR, env={**os.environ, "DECISION_LOG_DIR": "", **PROFILES[name]},
+        capture_output=True, text=True, check=True
+    ).stdout
+    # load_test prints its summary first, then the raw results
+    return json.loads(output[output.index("\n{") + 1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare submission bursts with and without admission control.")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument("--rate", type=float, default=60.0, help="Burst arrival rate in applications/s")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--pollers", type=int, default=8)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    print(f"Poisson burst of {args.rate:g} applications/s for {args.duration:g}s, "
+          f"{args.pollers} dashboards polling every {args.poll_interval}s")
+    print(f"{'profile':<16} {'sent':>6} {'shed':>6} {'retries':>7} {'goodput/s':>9} {'admitted p50':>12} "
+          f"{'admitted p99':>12} {'poll p50':>9} {'poll p99':>9}")
+    for name in args.profiles:
+        results = run_profile(name, args)
+        apply, poll = results["apply"], results["poll"]
+        admitted = apply["admitted_latency_ms"]
+        print(f"{name:<16} {apply['requests']:>6} {apply['shed']:>6} {apply['retries']:>7} "
+              f"{apply['goodput_per_sec']:>9} {admitted.get('p50', '-'):>12} {admitted.get('p99', '-'):>12} "
+              f"{poll['latency_ms'].get('p50', '-'):>9} {poll['latency_ms'].get('p99', '-'):>9}")
+
+
+if __name__ == "__main__":
+    main()
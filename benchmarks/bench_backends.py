@@ -0,0 +1,56 @@
+"""Compares Decision Agent execution backends: throughput and how long the event loop is stalled while scoring."""
+import asyncio
+import random
+import time
+
+from agents.decision_agent import DecisionAgent
+from benchmarks.bench_batching import random_intake
+
+BACKENDS = ["inline", "thread", "process"]
+CONCURRENCY = 64
+REQUESTS_PER_RUN = 2000
+
+
+async def heartbeat(stop, lags, interval=0.005):
+    # Measures event-loop lag: how late a 5 ms sleep wakes up while scoring is running
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(backend):
+    # A small batch cap keeps several batches in flight so pooled backends can use all workers
+    agent = DecisionAgent(backend=backend, max_batch_size=16)
+    # Warm up (spawns pool workers and loads their model copies)
+    await asyncio.gather(*(agent.decide(random_intake(), {"is_valid": True}) for _ in range(64)))
+
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one():
+        async with semaphore:
+            await agent.decide(random_intake(), {"is_valid": True})
+
+    stop, lags = asyncio.Event(), []
+    monitor = asyncio.create_task(heartbeat(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(REQUESTS_PER_RUN)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await monitor
+    agent.shutdown()
+
+    lags.sort()
+    return REQUESTS_PER_RUN / elapsed, max(lags) * 1000 if lags else 0.0
+
+
+async def main():
+    random.seed(42)
+    print(f"{'backend':>8} {'req/s':>9} {'max loop stall ms':>18}")
+    for backend in BACKENDS:
+        throughput, stall = await run(backend)
+        print(f"{backend:>8} {throughput:>9.1f} {stall:>18.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+"""Throughput vs. latency of the Decision Agent micro-batcher across batching windows and concurrency levels."""
+import asyncio
+import random
+import statistics
+import time
+
+from agents.decision_agent import DecisionAgent
+
+WINDOWS_MS = [0, 1, 2, 5, 10]
+CONCURRENCY = [1, 8, 32, 128]
+REQUESTS_PER_RUN = 512
+
+
+def random_intake():
+    return {"financials": {
+        "annual_income": float(random.randint(20000, 250000)),
+        "loan_amount": float(random.randint(5000, 40000)),
+        "credit_score": random.randint(300, 850),
+        "employment_status": random.choice([0, 1, 2]),
+        "housing_status": random.choice([0, 1, 2]),
+        "loan_term": random.choice([12, 36, 60]),
+    }}
+
+
+async def run(agent, concurrency, n_requests):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await agent.decide(random_intake(), {"is_valid": True})
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n_requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "throughput": n_requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main():
+    random.seed(42)
+    print(f"{'window_ms':>9} {'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'avg batch':>9}")
+    for window_ms in WINDOWS_MS:
+        for concurrency in CONCURRENCY:
+            agent = DecisionAgent(batch_window_ms=window_ms)
+            result = await run(agent, concurrency, REQUESTS_PER_RUN)
+            stats = agent.batch_stats()
+            print(f"{window_ms:>9} {concurrency:>5} {result['throughput']:>9.1f} "
+                  f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} {stats['avg_batch_size']:>9.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
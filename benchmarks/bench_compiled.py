@@ -0,0 +1,40 @@
+"""Per-row and per-batch latency of the sklearn ensemble vs. the compiled NumPy scorer."""
+import time
+import joblib
+import numpy as np
+import pandas as pd
+
+from agents.compiled_model import CompiledEnsemble
+from agents.decision_agent import FEATURE_COLUMNS
+
+BATCH_SIZES = [1, 16, 256, 4096]
+
+
+def best_of(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    model = joblib.load("loan_model.joblib")
+    compiled = CompiledEnsemble.load()
+    data = pd.read_csv("loan_data.csv")[FEATURE_COLUMNS]
+
+    print(f"{'batch':>6} {'sklearn ms':>11} {'compiled ms':>12} {'speedup':>8} {'compiled us/row':>16}")
+    for size in BATCH_SIZES:
+        frame = data.sample(size, replace=True, random_state=0).reset_index(drop=True)
+        matrix = frame.to_numpy(dtype=np.float64)
+        repeats = 20 if size < 1000 else 5
+
+        sklearn_s = best_of(lambda: model.predict_proba(frame), repeats)
+        compiled_s = best_of(lambda: compiled.predict_proba(matrix), repeats)
+        print(f"{size:>6} {sklearn_s * 1000:>11.3f} {compiled_s * 1000:>12.3f} "
+              f"{sklearn_s / compiled_s:>7.1f}x {compiled_s / size * 1e6:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Mixed apply + dashboard load against the in-process ASGI app, reporting throughput and latency percentiles.
+
+Runs against a scratch copy of loan_agent.db so the real database is left untouched.
+"""
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+SCRATCH_DIR = tempfile.mkdtemp(prefix="loan-bench-")
+shutil.copy("loan_agent.db", os.path.join(SCRATCH_DIR, "loan_agent.db"))
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{SCRATCH_DIR}/loan_agent.db")
+
+import httpx  # noqa: E402
+import main  # noqa: E402
+
+APPLY_REQUESTS = 200
+DASHBOARD_REQUESTS = 50
+CONCURRENCY = 32
+
+
+def random_form():
+    return {
+        "first_name": "Bench", "last_name": "User", "email": "bench@example.com",
+        "annual_income": random.randint(20000, 250000),
+        "loan_amount": random.randint(5000, 40000),
+        "credit_score": random.randint(300, 850),
+        "employment_status": random.choice([0, 1, 2]),
+        "housing_status": random.choice([0, 1, 2]),
+        "loan_term": random.choice([12, 36, 60]),
+    }
+
+
+async def main_async():
+    random.seed(42)
+    transport = httpx.ASGITransport(app=main.app)
+    latencies = {"apply": [], "dashboard": []}
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def call(kind):
+            async with semaphore:
+                start = time.perf_counter()
+                if kind == "apply":
+                    response = await client.post("/api/apply", data=random_form())
+                else:
+                    response = await client.get("/api/dashboard-data")
+                if response.status_code >= 500:
+                    raise RuntimeError(f"{kind} failed: {response.text}")
+                latencies[kind].append(time.perf_counter() - start)
+
+        kinds = ["apply"] * APPLY_REQUESTS + ["dashboard"] * DASHBOARD_REQUESTS
+        random.shuffle(kinds)
+        start = time.perf_counter()
+        await asyncio.gather(*(call(kind) for kind in kinds))
+        elapsed = time.perf_counter() - start
+
+    print(f"{len(kinds)} requests in {elapsed:.2f}s -> {len(kinds) / elapsed:.1f} req/s (concurrency {CONCURRENCY})")
+    for kind, values in latencies.items():
+        values.sort()
+        print(f"  {kind:>9}: p50 {statistics.median(values) * 1000:7.1f} ms"
+              f"  p99 {values[int(len(values) * 0.99) - 1] * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main_async())
+    finally:
+        shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
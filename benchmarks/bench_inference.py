@@ -0,0 +1,69 @@
+"""Single-row scoring latency and worker memory of the request path, with and without pandas.
+
+"dataframe" is the previous path: the model as pickled, scored through a one-row DataFrame per call. "numpy" is
+the current one: load_model() verifies the feature order once and every call scores a float64 row directly.
+"compiled" is the same call on the NumPy export (DECISION_SCORER=compiled). sklearn imports pandas itself when
+installed, so only the compiled scorer keeps pandas out of the worker entirely.
+Each path runs in a fresh interpreter so resident memory and the modules it pulls in are its own.
+"""
+import json
+import os
+import subprocess
+import sys
+
+CALLS = 500
+
+CHILD = r"""
+import json, sys, time
+import numpy as np
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+
+from agents.decision_agent import (
+    COMPILED_MODEL_PATH, FEATURE_COLUMNS, MODEL_PATH, WARMUP_FEATURES, load_model, score_matrix
+)
+path, calls = sys.argv[1], int(sys.argv[2])
+row = np.array([WARMUP_FEATURES])
+
+if path == "dataframe":
+    import joblib
+    import pandas as pd
+    model = joblib.load(MODEL_PATH)
+    call = lambda: model.predict_proba(pd.DataFrame(row, columns=FEATURE_COLUMNS))
+else:
+    model = load_model(COMPILED_MODEL_PATH if path == "compiled" else MODEL_PATH)
+    call = lambda: score_matrix(model, row)
+
+for _ in range(20):
+    call()
+samples = []
+for _ in range(calls):
+    started = time.perf_counter()
+    call()
+    samples.append(time.perf_counter() - started)
+samples.sort()
+print(json.dumps({"p50_ms": samples[len(samples) // 2] * 1000, "p99_ms": samples[int(len(samples) * 0.99)] * 1000,
+                  "rss_mb": rss_mb(), "pandas_loaded": "pandas" in sys.modules}))
+"""
+
+
+def run(path):
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", CHILD, path, str(CALLS)], cwd=project_dir,
+                         env=dict(os.environ, PYTHONWARNINGS="ignore"), capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    print(f"{'path':<11}{'p50 ms':>8}{'p99 ms':>8}{'RSS MB':>8}  pandas loaded")
+    for path in ("dataframe", "numpy", "compiled"):
+        r = run(path)
+        print(f"{path:<11}{r['p50_ms']:>8.3f}{r['p99_ms']:>8.3f}{r['rss_mb']:>8.0f}  {r['pandas_loaded']}")
+
+
+if __name__ == "__main__":
+    main()
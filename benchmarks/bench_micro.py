@@ -0,0 +1,120 @@
+"""Microbenchmarks of hot-path code: DecisionAgent.decide (model and cache-hit paths), build_decision, the explainer
+and the dashboard formatting in main.py. Reports per-call latency percentiles in microseconds and can store or compare
+against a baseline like benchmarks.load_test.
+
+    python -m benchmarks.bench_micro
+    python -m benchmarks.bench_micro --compare
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+from benchmarks.common import percentiles, report_against_baseline, save_baseline, scratch_database
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "micro.json")
+
+
+def summarize(samples, elapsed):
+    return {"calls_per_sec": round(len(samples) / elapsed, 1), "latency_us": percentiles(samples, scale=1e6)}
+
+
+def time_sync(fn, iterations):
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, time.perf_counter() - started)
+
+
+async def time_async(fn, iterations):
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, time.perf_counter() - started)
+
+
+async def run(iterations):
+    # Imported only now: config reads DATABASE_URL on import, which must already point at the scratch copy
+    import main
+    import models
+    import numpy as np
+    from agents.decision_agent import DecisionAgent, build_decision, extract_features
+    from benchmarks.bench_batching import random_intake
+
+    results = {}
+    intakes = [random_intake() for _ in range(iterations)]
+    valid = {"is_valid": True}
+
+    # Sequential calls with no batching window: the per-request model cost
+    agent = DecisionAgent(batch_window_ms=0, cache_size=0)
+    await agent.start()
+    feed = iter(intakes)
+    results["decide_model"] = await time_async(lambda: agent.decide(next(feed), valid), iterations)
+    agent.shutdown()
+
+    agent = DecisionAgent(batch_window_ms=0)
+    await agent.start()
+    await agent.decide(intakes[0], valid)
+    results["decide_cache_hit"] = await time_async(lambda: agent.decide(intakes[0], valid), iterations)
+    agent.shutdown()
+
+    features = extract_features(intakes[0]["financials"])
+    matrix = np.array([features], dtype=np.float64)
+    results["build_decision"] = time_sync(lambda: build_decision(features, 1, 0.87), iterations)
+    results["explain_row"] = time_sync(lambda: agent.active.explainer.explain(matrix), iterations)
+    batch = np.array([extract_features(intake["financials"]) for intake in intakes[:64]], dtype=np.float64)
+    results["explain_batch_64"] = time_sync(lambda: agent.active.explainer.explain(batch), max(1, iterations // 10))
+
+    page = [
+        models.Application(id=i, first_name="Jane", last_name="Doe", email="jane@example.com",
+                           annual_income=random.randint(20000, 250000), loan_amount=random.randint(5000, 40000),
+                           credit_score=random.randint(300, 850), employment_status=2, housing_status=1, loan_term=36,
+                           status=random.choice(["Approved", "Rejected"]), confidence=87.5, remarks="")
+        for i in range(100)
+    ]
+    results["format_application"] = time_sync(lambda: main.format_application(page[0]), iterations)
+    results["format_feed_page_100"] = time_sync(lambda: [main.format_application(app) for app in page],
+                                                max(1, iterations // 10))
+    counts = {"Approved": 1200, "Rejected": 800, "Error": 3, models.PROCESSING: 2}
+    results["stats_from_counts"] = time_sync(lambda: main.stats_from_counts(counts), iterations)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the decision and dashboard hot paths.")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    with scratch_database():
+        results = asyncio.run(run(args.iterations))
+
+    print(f"{'operation':<22}{'calls/s':>12}{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}")
+    for name, result in results.items():
+        latency = result["latency_us"]
+        print(f"{name:<22}{result['calls_per_sec']:>12,.0f}{latency['p50']:>10.1f}{latency['p90']:>10.1f}{latency['p99']:>10.1f}")
+
+    scenario = "micro"
+    if args.save_baseline:
+        save_baseline(args.baseline, scenario, results)
+        print(f"Saved baseline [{scenario}] to {args.baseline}")
+    # Tail latencies of microsecond-scale calls are mostly scheduler noise, so only medians are compared
+    if args.compare and not report_against_baseline(args.baseline, scenario, results, args.tolerance, latency_keys=("p50",)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
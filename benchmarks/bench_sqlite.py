@@ -0,0 +1,59 @@
+"""Concurrent read/write throughput of the SQLite profiles: the original rollback journal, the WAL performance
+profile, and WAL with group commit.
+
+Each profile runs benchmarks/load_test.py closed loop (submissions as fast as --concurrency allows) with dashboards
+polling the feed, in its own process and on its own scratch copy of loan_agent.db, since the settings are read at
+import time.
+
+    python -m benchmarks.bench_sqlite --requests 1000 --concurrency 32 --pollers 8
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    "journal": {"SQLITE_PROFILE": "default", "DB_GROUP_COMMIT_MS": "0"},
+    "wal": {"SQLITE_PROFILE": "performance", "DB_GROUP_COMMIT_MS": "0"},
+    "wal+group-commit": {"SQLITE_PROFILE": "performance", "DB_GROUP_COMMIT_MS": "2"},
+}
+
+
+def run_profile(env, args):
+    command = [
+        sys.executable, "-m", "benchmarks.load_test", "--rate", "0", "--requests", str(args.requests),
+        "--duration", "600", "--concurrency", str(args.concurrency), "--pollers", str(args.pollers),
+        "--poll-interval", str(args.poll_interval), "--json",
+    ]
+    output = subprocess.run(
+        command, cwd=PROJECT_DIR, env={**os.environ, **env}, capture_output=True, text=True, check=True
+    ).stdout
+    # load_test prints its summary first, then the raw results
+    return json.loads(output[output.index("\n{") + 1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare SQLite profiles under concurrent submissions and polling.")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--pollers", type=int, default=8)
+    parser.add_argument("--poll-interval", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(f"{args.requests} closed-loop submissions, concurrency {args.concurrency}, "
+          f"{args.pollers} dashboards polling every {args.poll_interval}s")
+    print(f"{'profile':<18} {'apply/s':>8} {'apply p50':>10} {'apply p99':>10} {'polls':>6} {'poll p50':>9} {'poll p99':>9}")
+    for name in args.profiles:
+        results = run_profile(PROFILES[name], args)
+        apply, poll = results["apply"], results["poll"]
+        print(f"{name:<18} {apply['throughput_per_sec']:>8} {apply['latency_ms']['p50']:>10} "
+              f"{apply['latency_ms']['p99']:>10} {poll['requests']:>6} {poll['latency_ms'].get('p50', '-'):>9} "
+              f"{poll['latency_ms'].get('p99', '-'):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""API startup cost per worker: time until main.py is importable (the server can serve static files and the
+dashboard), time until the Decision Agent is warm, and resident memory at both points.
+
+Each configuration runs in a fresh interpreter against a scratch copy of loan_agent.db. "eager" is the old
+behaviour of loading the model while main.py is imported.
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+RUNS = 3
+CONFIGS = [("eager", "sklearn"), ("background", "sklearn"), ("eager", "compiled"), ("background", "compiled")]
+
+CHILD = r"""
+import asyncio, json, sys, time
+started = time.perf_counter()
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+
+import main
+imported = time.perf_counter() - started
+import_rss = rss_mb()
+heavy_at_import = sorted(m for m in ("pandas", "sklearn", "joblib") if m in sys.modules)
+
+async def warm():
+    async with main.app.router.lifespan_context(main.app):
+        while not main.decision_agent.loaded or main.decision_agent.state == "warming":
+            await asyncio.sleep(0.005)
+        return time.perf_counter() - started
+
+ready = asyncio.run(warm())
+print(json.dumps({"import_s": imported, "ready_s": ready, "import_rss_mb": import_rss, "ready_rss_mb": rss_mb(),
+                  "state": main.decision_agent.state, "heavy_at_import": heavy_at_import}))
+"""
+
+
+def run(mode, scorer, database_url):
+    env = dict(os.environ, DECISION_LOAD_MODE=mode, DECISION_SCORER=scorer, DATABASE_URL=database_url,
+               PYTHONWARNINGS="ignore")
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", CHILD], env=env, cwd=project_dir,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    scratch = tempfile.mkdtemp(prefix="loan-bench-")
+    try:
+        shutil.copy("loan_agent.db", os.path.join(scratch, "loan_agent.db"))
+        database_url = f"sqlite+aiosqlite:///{scratch}/loan_agent.db"
+
+        print(f"{'mode':<11}{'scorer':<10}{'import s':>10}{'ready s':>10}{'RSS import MB':>15}{'RSS ready MB':>14}"
+              f"  heavy modules at import")
+        for mode, scorer in CONFIGS:
+            results = [run(mode, scorer, database_url) for _ in range(RUNS)]
+            best = min(results, key=lambda r: r["ready_s"])
+            print(f"{mode:<11}{scorer:<10}{min(r['import_s'] for r in results):>10.2f}"
+                  f"{best['ready_s']:>10.2f}{best['import_rss_mb']:>15.0f}{best['ready_rss_mb']:>14.0f}"
+                  f"  {', '.join(best['heavy_at_import']) or '-'} ({best['state']})")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
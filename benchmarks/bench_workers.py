@@ -0,0 +1,124 @@
+"""Throughput, latency and memory of the multi-worker deployment (gunicorn.conf.py) by worker count.
+
+For each worker count a gunicorn master is started on a scratch copy of loan_agent.db and a scratch shared store,
+benchmarks/load_test.py drives it closed loop over HTTP, and the memory of the master plus its workers is read
+from /proc as PSS (proportional set size), which charges pages shared copy-on-write after the fork only once
+in total. The RSS sum next to it counts them once per process, as if every worker loaded its own model.
+
+    python -m benchmarks.bench_workers --workers 1 2 4 --requests 2000
+
+Throughput can only scale up to the number of CPUs available to the machine.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import scratch_database
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def process_tree(pid):
+    children = []
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            children = [int(child) for child in f.read().split()]
+    except OSError:
+        pass
+    return [pid] + [descendant for child in children for descendant in process_tree(child)]
+
+
+def memory_mb(pids):
+    """(PSS, RSS) summed over pids, in MB."""
+    pss = rss = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                for line in f:
+                    if line.startswith("Pss:"):
+                        pss += int(line.split()[1])
+                    elif line.startswith("Rss:"):
+                        rss += int(line.split()[1])
+        except OSError:
+            continue
+    return pss / 1024, rss / 1024
+
+
+def wait_ready(url, server, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with {server.returncode}")
+        try:
+            if httpx.get(url + "/api/ready", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("gunicorn did not become ready")
+
+
+def run_workers(workers, args):
+    port = args.port + workers
+    url = f"http://127.0.0.1:{port}"
+    store_dir = tempfile.mkdtemp(prefix="loan-bench-store-")
+    env = {
+        **os.environ,
+        "WEB_CONCURRENCY": str(workers),
+        "BIND": f"127.0.0.1:{port}",
+        "SHARED_STORE_URL": "sqlite:///" + os.path.join(store_dir, "shared_store.db"),
+        "DECISION_LOG_DIR": "",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--log-level", "warning", "main:app"],
+        cwd=PROJECT_DIR, env=env
+    )
+    try:
+        wait_ready(url, server)
+        # /api/ready answered from one worker; give the others time to finish their startup too
+        time.sleep(2)
+        idle = memory_mb(process_tree(server.pid))
+        command = [
+            sys.executable, "-m", "benchmarks.load_test", "--url", url, "--rate", "0",
+            "--requests", str(args.requests), "--duration", "600", "--concurrency", str(args.concurrency),
+            "--pollers", str(args.pollers), "--json",
+        ]
+        output = subprocess.run(command, cwd=PROJECT_DIR, capture_output=True, text=True, check=True).stdout
+        loaded = memory_mb(process_tree(server.pid))
+        return json.loads(output[output.index("\n{") + 1:]), idle, loaded
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare gunicorn worker counts under concurrent submissions.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--pollers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8800)
+    args = parser.parse_args()
+
+    print(f"{args.requests} closed-loop submissions, concurrency {args.concurrency}, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'apply/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>6} "
+          f"{'idle PSS MB':>11} {'PSS MB':>7} {'RSS sum MB':>10}")
+    with scratch_database():
+        for workers in args.workers:
+            results, idle, loaded = run_workers(workers, args)
+            apply = results["apply"]
+            print(f"{workers:>7} {apply['throughput_per_sec']:>8} {apply['latency_ms']['p50']:>8} "
+                  f"{apply['latency_ms']['p99']:>8} {apply['errors']:>6} {idle[0]:>11.0f} {loaded[0]:>7.0f} "
+                  f"{loaded[1]:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
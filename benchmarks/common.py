@@ -0,0 +1,99 @@
+"""Helpers shared by the load test and microbenchmarks: scratch databases, percentiles and baseline comparison."""
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def scratch_database(source="loan_agent.db"):
+    """Point DATABASE_URL at a throwaway copy of the database. Enter before importing main."""
+    directory = tempfile.mkdtemp(prefix="loan-bench-")
+    path = os.path.join(directory, "loan_agent.db")
+    if os.path.exists(source):
+        shutil.copy(source, path)
+    previous = os.environ.get("DATABASE_URL")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    try:
+        yield os.environ["DATABASE_URL"]
+    finally:
+        if previous is None:
+            os.environ.pop("DATABASE_URL", None)
+        else:
+            os.environ["DATABASE_URL"] = previous
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def percentiles(seconds, scale=1000.0):
+    """p50/p90/p99/max/mean of a list of durations, in milliseconds by default."""
+    if not seconds:
+        return {"count": 0}
+    values = sorted(seconds)
+
+    def pick(q):
+        return values[min(len(values) - 1, int(q * len(values)))] * scale
+
+    return {
+        "count": len(values),
+        "p50": round(pick(0.50), 3),
+        "p90": round(pick(0.90), 3),
+        "p99": round(pick(0.99), 3),
+        "max": round(values[-1] * scale, 3),
+        "mean": round(sum(values) / len(values) * scale, 3),
+    }
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, scenario, results):
+    """Store results under their scenario name, keeping the other scenarios already in the file."""
+    baseline = load_baseline(path)
+    baseline[scenario] = results
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(results, baseline, tolerance, latency_keys=("p50", "p99")):
+    """Regressions of results against a baseline entry: latencies that grew or throughputs that shrank by more
+    than tolerance (a fraction). Keys ending in _per_sec count as throughput, latency_keys inside dicts as latency."""
+    regressions = []
+
+    def walk(current, previous, prefix):
+        for key, value in current.items():
+            if key not in previous:
+                continue
+            name = f"{prefix}{key}"
+            if isinstance(value, dict):
+                walk(value, previous[key], name + ".")
+            elif key.endswith("_per_sec") and value < previous[key] * (1 - tolerance):
+                regressions.append(f"{name}: {value} < baseline {previous[key]}")
+            elif key in latency_keys and value > previous[key] * (1 + tolerance):
+                regressions.append(f"{name}: {value} > baseline {previous[key]}")
+
+    walk(results, baseline, "")
+    return regressions
+
+
+def report_against_baseline(path, scenario, results, tolerance, latency_keys=("p50", "p99")):
+    """Print the comparison with the stored baseline and return True when nothing regressed."""
+    baseline = load_baseline(path).get(scenario)
+    if baseline is None:
+        print(f"No baseline for scenario {scenario!r} in {path}; run with --save-baseline first.")
+        return True
+    regressions = compare(results, baseline, tolerance, latency_keys)
+    if regressions:
+        print(f"REGRESSIONS vs {path} [{scenario}] (tolerance {tolerance:.0%}):")
+        for line in regressions:
+            print(f"  {line}")
+        return False
+    print(f"No regressions vs {path} [{scenario}] (tolerance {tolerance:.0%}).")
+    return True
@@ -0,0 +1,277 @@
+"""Load test for the loan API: application submissions at a configurable rate plus background dashboard polling.
+
+Targets the in-process ASGI app by default, a local uvicorn started for the run (--uvicorn), or an already running
+server (--url). The first two use a scratch copy of loan_agent.db. Applications follow the profile mix of
+populate_dashboard.py. Prints latency percentiles, throughput and the mean Server-Timing stage breakdown, and can
+store or compare against a baseline to catch regressions.
+
+Examples:
+    python -m benchmarks.load_test --rate 50 --duration 10 --pollers 5
+    python -m benchmarks.load_test --rate 0 --concurrency 64 --requests 2000     # closed loop: max throughput
+    python -m benchmarks.load_test --uvicorn --rate 100 --compare
+    python -m benchmarks.load_test --rate 300 --concurrency 1000 --max-retries 3  # burst past capacity: shedding
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+import populate_dashboard
+from benchmarks.common import percentiles, report_against_baseline, save_baseline, scratch_database
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "load_test.json")
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Statuses admission control answers with when it turns a submission away
+SHED_STATUS_CODES = (429, 503)
+
+
+class ApplyStats:
+    def __init__(self):
+        self.latencies = []
+        self.admitted_latencies = []
+        self.status_codes = Counter()
+        self.errors = 0
+        self.retries = 0
+        self.stages = defaultdict(list)
+
+    def record(self, response, latency):
+        self.latencies.append(latency)
+        self.status_codes[response.status_code] += 1
+        if response.status_code not in SHED_STATUS_CODES:
+            self.admitted_latencies.append(latency)
+        for part in response.headers.get("server-timing", "").split(","):
+            name, _, duration = part.strip().partition(";dur=")
+            if duration:
+                self.stages[name].append(float(duration))
+
+
+async def submit_applications(client, args, stats):
+    """Open loop (Poisson arrivals at --rate) or, with --rate 0, closed loop with --concurrency workers."""
+    semaphore = asyncio.Semaphore(args.concurrency)
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    limit = args.requests or float("inf")
+
+    async def send(scheduled):
+        form = populate_dashboard.generate_application()
+        try:
+            async with semaphore:
+                response = await client.post("/api/apply", data=form)
+            for _ in range(args.max_retries):
+                if response.status_code not in SHED_STATUS_CODES or "retry-after" not in response.headers:
+                    break
+                # Back off as told, outside the concurrency cap, like a well-behaved client
+                stats.retries += 1
+                await asyncio.sleep(float(response.headers["retry-after"]))
+                async with semaphore:
+                    response = await client.post("/api/apply", data=form)
+        except httpx.HTTPError:
+            stats.errors += 1
+            return
+        # Measured from the scheduled send time so queueing behind the concurrency cap still counts
+        stats.record(response, time.perf_counter() - scheduled)
+
+    if args.rate > 0:
+        tasks, next_at = [], started
+        while len(tasks) < limit:
+            next_at += rng.expovariate(args.rate)
+            if next_at - started > args.duration:
+                break
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(send(next_at)))
+        await asyncio.gather(*tasks)
+    else:
+        sent = 0
+
+        async def worker():
+            nonlocal sent
+            while sent < limit and time.perf_counter() - started < args.duration:
+                sent += 1
+                await send(time.perf_counter())
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return time.perf_counter() - started
+
+
+async def poll_dashboard(client, interval, offset, stop, latencies, errors):
+    """Mimic one open dashboard: incremental feed polls carrying the since_id cursor forward."""
+    since_id = None
+    try:
+        await asyncio.wait_for(stop.wait(), timeout=offset)
+        return
+    except asyncio.TimeoutError:
+        pass
+    while not stop.is_set():
+        params = {"limit": 100}
+        if since_id is not None:
+            params["since_id"] = since_id
+        start = time.perf_counter()
+        try:
+            response = await client.get("/api/dashboard/feed", params=params)
+            latencies.append(time.perf_counter() - start)
+            since_id = response.json().get("since_id", since_id)
+        except (httpx.HTTPError, ValueError):
+            errors.append(1)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def wait_until_ready(client, timeout=120.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get("/api/ready")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become ready in time")
+
+
+async def run_load(client, args):
+    await wait_until_ready(client)
+    stats = ApplyStats()
+    poll_latencies, poll_errors = [], []
+    stop = asyncio.Event()
+    pollers = [
+        asyncio.ensure_future(poll_dashboard(client, args.poll_interval, i * args.poll_interval / max(args.pollers, 1),
+                                             stop, poll_latencies, poll_errors))
+        for i in range(args.pollers)
+    ]
+    elapsed = await submit_applications(client, args, stats)
+    stop.set()
+    await asyncio.gather(*pollers)
+
+    completed = len(stats.latencies)
+    admitted = len(stats.admitted_latencies)
+    return {
+        "apply": {
+            "requests": completed,
+            "throughput_per_sec": round(completed / elapsed, 1) if elapsed else 0.0,
+            # Submissions actually processed, without the ones shed by admission control
+            "goodput_per_sec": round(admitted / elapsed, 1) if elapsed else 0.0,
+            "latency_ms": percentiles(stats.latencies),
+            "admitted_latency_ms": percentiles(stats.admitted_latencies),
+            "status_codes": {str(code): n for code, n in sorted(stats.status_codes.items())},
+            "shed": completed - admitted,
+            "retries": stats.retries,
+            "errors": stats.errors,
+            "stages_ms": {name: round(sum(values) / len(values), 3) for name, values in stats.stages.items()},
+        },
+        "poll": {
+            "requests": len(poll_latencies),
+            "latency_ms": percentiles(poll_latencies),
+            "errors": len(poll_errors),
+        },
+    }
+
+
+async def run_in_process(args):
+    import main
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+            return await run_load(client, args)
+
+
+async def run_against(url, args):
+    limits = httpx.Limits(max_connections=args.concurrency + args.pollers)
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout, limits=limits) as client:
+        return await run_load(client, args)
+
+
+def run_uvicorn(args):
+    port = str(args.port)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", port, "--log-level", "warning"],
+        cwd=PROJECT_DIR, env=dict(os.environ)
+    )
+    try:
+        return asyncio.run(run_against(f"http://127.0.0.1:{port}", args))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def print_results(results):
+    apply, poll = results["apply"], results["poll"]
+    latency = apply["latency_ms"]
+    print(f"apply: {apply['requests']} requests, {apply['throughput_per_sec']} req/s, errors {apply['errors']}, "
+          f"status {apply['status_codes']}")
+    if latency["count"]:
+        print(f"  latency ms: p50 {latency['p50']}  p90 {latency['p90']}  p99 {latency['p99']}  max {latency['max']}")
+    if apply["shed"] or apply["retries"]:
+        admitted = apply["admitted_latency_ms"]
+        print(f"  shed (429/503): {apply['shed']}, retries after Retry-After: {apply['retries']}, "
+              f"goodput {apply['goodput_per_sec']} req/s")
+        if admitted["count"]:
+            print(f"  admitted latency ms: p50 {admitted['p50']}  p90 {admitted['p90']}  p99 {admitted['p99']}")
+    if apply["stages_ms"]:
+        print("  mean stage ms: " + ", ".join(f"{name} {value}" for name, value in apply["stages_ms"].items()))
+    latency = poll["latency_ms"]
+    if latency["count"]:
+        print(f"poll:  {poll['requests']} requests, errors {poll['errors']}, "
+              f"latency ms: p50 {latency['p50']}  p90 {latency['p90']}  p99 {latency['p99']}  max {latency['max']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the loan API and compare against a stored baseline.")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="Already running server, e.g. http://127.0.0.1:8000")
+    target.add_argument("--uvicorn", action="store_true", help="Start a local uvicorn on --port for the run")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=50.0, help="Poisson arrival rate in applications/s; 0 = closed loop")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of submissions")
+    parser.add_argument("--requests", type=int, default=0, help="Stop after this many submissions (0 = duration only)")
+    parser.add_argument("--concurrency", type=int, default=64, help="Maximum submissions in flight")
+    parser.add_argument("--pollers", type=int, default=5, help="Simulated open dashboards")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between polls per dashboard")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--max-retries", type=int, default=0,
+                        help="Resubmit a shed (429/503) application up to this many times, after its Retry-After")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenario", help="Baseline key (default: derived from the options)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the scenario baseline")
+    parser.add_argument("--compare", action="store_true", help="Exit 1 if results regress against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression as a fraction")
+    parser.add_argument("--json", action="store_true", help="Print the raw results as JSON")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    populate_dashboard.fake.seed_instance(args.seed)
+    kind = "url" if args.url else "uvicorn" if args.uvicorn else "asgi"
+    scenario = args.scenario or f"{kind}-rate{args.rate:g}-c{args.concurrency}-pollers{args.pollers}"
+
+    if args.url:
+        results = asyncio.run(run_against(args.url, args))
+    else:
+        with scratch_database():
+            results = run_uvicorn(args) if args.uvicorn else asyncio.run(run_in_process(args))
+
+    print(f"[{scenario}]")
+    print_results(results)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    if args.save_baseline:
+        save_baseline(args.baseline, scenario, results)
+        print(f"Saved baseline [{scenario}] to {args.baseline}")
+    if args.compare and not report_against_baseline(args.baseline, scenario, results, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
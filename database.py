@@ -1,19 +1,87 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./loan_agent.db"
+import config
 
+# Async driver used by the API -> blocking driver used by scripts and table creation
+SYNC_DRIVERS = {
+    "sqlite+aiosqlite": "sqlite",
+    "postgresql+asyncpg": "postgresql+psycopg2",
+}
+
+ASYNC_DATABASE_URL = config.DATABASE_URL
+_url = make_url(ASYNC_DATABASE_URL)
+SQLALCHEMY_DATABASE_URL = _url.set(
+    drivername=SYNC_DRIVERS.get(_url.drivername, _url.drivername)
+).render_as_string(hide_password=False)
+IS_SQLITE = _url.get_backend_name() == "sqlite"
+# Concurrent sessions now really overlap, so give SQLite writers time to wait for the lock
+SQLITE_CONNECT_ARGS = {"timeout": config.DB_BUSY_TIMEOUT}
+
+# Blocking engine for scripts, migrations and create_all
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False, **SQLITE_CONNECT_ARGS} if IS_SQLITE else {}
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Pooled async engine for the request path, so DB I/O no longer blocks the event loop
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=SQLITE_CONNECT_ARGS if IS_SQLITE else {},
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    pool_timeout=config.DB_POOL_TIMEOUT,
+    pool_recycle=config.DB_POOL_RECYCLE,
+    pool_pre_ping=not IS_SQLITE,
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Priority lane for dashboard and status reads: its own small pool, never exhausted by submissions
+read_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=SQLITE_CONNECT_ARGS if IS_SQLITE else {},
+    pool_size=config.DB_READ_POOL_SIZE,
+    max_overflow=config.DB_READ_POOL_SIZE,
+    pool_timeout=config.DB_POOL_TIMEOUT,
+    pool_recycle=config.DB_POOL_RECYCLE,
+    pool_pre_ping=not IS_SQLITE,
+)
+ReadSessionLocal = async_sessionmaker(read_engine, autoflush=False, expire_on_commit=False)
+
+def sqlite_pragmas(profile=config.SQLITE_PROFILE):
+    """PRAGMAs run on every new SQLite connection for the configured profile."""
+    if profile != "performance":
+        # journal_mode is stored in the database file, so switching back has to be explicit
+        return ["PRAGMA journal_mode=DELETE"]
+    return [
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size=-{config.SQLITE_CACHE_KB}",  # negative = KiB rather than pages
+        f"PRAGMA mmap_size={config.SQLITE_MMAP_BYTES}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in sqlite_pragmas():
+        cursor.execute(pragma)
+    cursor.close()
+
+if IS_SQLITE:
+    # Every engine, so scripts and the API agree on the journal mode
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    event.listen(read_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_read_db():
+    async with ReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
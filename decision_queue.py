@@ -0,0 +1,73 @@
+import asyncio
+
+
+class DecisionQueue:
+    """Application ids accepted by POST /api/apply in async mode, drained in batches by background workers.
+
+    The rows themselves are already committed as Processing, so the queue only carries ids; anything left in
+    it at shutdown is picked up again from the database by the next start (see main.lifespan).
+    """
+
+    def __init__(self, handler, workers=2, batch_size=64, max_size=10000):
+        self.handler = handler  # async callable taking a list of application ids
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_size = max_size
+        self._queue = asyncio.Queue()
+        self._tasks = []
+        self._in_progress = 0
+        self.processed = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.last_error = None
+
+    @property
+    def depth(self):
+        """Applications waiting in the queue plus those in batches being processed."""
+        return self._queue.qsize() + self._in_progress
+
+    def full(self):
+        return self.depth >= self.max_size
+
+    def put(self, app_id):
+        self._queue.put_nowait(app_id)
+
+    def start(self):
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        while True:
+            ids = [await self._queue.get()]
+            # Whatever else is already waiting joins the batch, up to batch_size
+            while len(ids) < self.batch_size and not self._queue.empty():
+                ids.append(self._queue.get_nowait())
+            self._in_progress += len(ids)
+            try:
+                await self.handler(ids)
+            except Exception as e:
+                # The handler finalizes failed rows itself; this only keeps the worker alive
+                self.failed_batches += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+            finally:
+                self._in_progress -= len(ids)
+                self.processed += len(ids)
+                self.batches += 1
+
+    def stats(self):
+        return {
+            "depth": self.depth,
+            "workers": self.workers,
+            "batch_size": self.batch_size,
+            "max_size": self.max_size,
+            "processed": self.processed,
+            "batches": self.batches,
+            "avg_batch_size": round(self.processed / self.batches, 2) if self.batches else 0.0,
+            "failed_batches": self.failed_batches,
+            "last_error": self.last_error,
+        }
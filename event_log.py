@@ -0,0 +1,143 @@
+"""Structured decision-event log and sampled access logging.
+
+Every decided application becomes one compact JSON record (features, stage timings, model version, outcome).
+Requests only append to an in-memory ring buffer; a background task drains it in batches to gzip-compressed
+NDJSON segments that rotate by size, with the oldest deleted past a retention limit. replay_decisions.py reads
+them back with read_events().
+"""
+import asyncio
+import glob
+import gzip
+import json
+import logging
+import os
+import time
+from collections import deque
+
+SEGMENT_PATTERN = "decisions-*.ndjson.gz"
+
+# Request paths the dashboards and monitoring hit on a timer; their successful access log lines are sampled
+POLL_PATHS = ("/api/dashboard", "/api/ready", "/api/decision-stats", "/api/applications/", "/metrics")
+
+
+class DecisionEventLog:
+    """Ring buffer of decision events plus the background writer that persists it."""
+
+    def __init__(self, directory, buffer_size=10000, flush_seconds=1.0, segment_bytes=16 * 1024 * 1024,
+                 max_segments=50):
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        # Bounded: if the disk stalls, the oldest unwritten events are dropped rather than requests slowed down
+        self._buffer = deque(maxlen=buffer_size)
+        self._segment = None
+        self._task = None
+
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.segments = 0
+        self.write_errors = 0
+        self.last_error = None
+
+    def record(self, event):
+        """Queue one event; never blocks on I/O."""
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(event)
+        self.recorded += 1
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._task = asyncio.ensure_future(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            await self.flush()
+
+    async def flush(self):
+        if not self._buffer:
+            return
+        events = [self._buffer.popleft() for _ in range(len(self._buffer))]
+        try:
+            # Encoding, compression and the write all happen off the event loop
+            await asyncio.to_thread(self._write, events)
+            self.written += len(events)
+        except Exception as e:
+            self.write_errors += 1
+            self.dropped += len(events)
+            self.last_error = f"{type(e).__name__}: {e}"
+
+    def _write(self, events):
+        if self._segment is None or os.path.getsize(self._segment) >= self.segment_bytes:
+            self._rotate()
+        payload = "".join(json.dumps(event, separators=(",", ":")) + "\n" for event in events)
+        # Each flush appends a gzip member; gzip readers see the concatenation as one stream
+        with gzip.open(self._segment, "ab", compresslevel=6) as f:
+            f.write(payload.encode())
+
+    def _rotate(self):
+        # Timestamp plus pid, so several server processes never append to the same segment
+        name = f"decisions-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self.segments}.ndjson.gz"
+        self._segment = os.path.join(self.directory, name)
+        self.segments += 1
+        existing = sorted(glob.glob(os.path.join(self.directory, SEGMENT_PATTERN)), key=os.path.getmtime)
+        for old in existing[:max(0, len(existing) - self.max_segments + 1)]:
+            os.remove(old)
+
+    def stats(self):
+        return {
+            "directory": self.directory,
+            "segment": os.path.basename(self._segment) if self._segment else None,
+            "buffered": len(self._buffer),
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "write_errors": self.write_errors,
+            "last_error": self.last_error,
+        }
+
+
+def segment_paths(path):
+    """Segments under a directory in write order, or a single segment file."""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, SEGMENT_PATTERN)), key=os.path.getmtime)
+    return [path]
+
+
+def read_events(path):
+    """Stream decision events back from a segment directory or file, oldest first."""
+    for segment in segment_paths(path):
+        with gzip.open(segment, "rt") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class SampledAccessLog(logging.Filter):
+    """uvicorn.access filter that keeps 1 in `every` successful poll requests and every other line."""
+
+    def __init__(self, every=100, poll_paths=POLL_PATHS):
+        super().__init__()
+        self.every = every
+        self.poll_paths = poll_paths
+        self.polls = 0
+
+    def filter(self, record):
+        # uvicorn logs access lines as (client, method, path, http_version, status_code)
+        if not isinstance(record.args, tuple) or len(record.args) != 5:
+            return True
+        path, status_code = str(record.args[2]), record.args[4]
+        if not path.startswith(self.poll_paths) or not isinstance(status_code, int) or status_code >= 400:
+            return True
+        self.polls += 1
+        return self.every > 0 and self.polls % self.every == 1 % self.every
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import time
+
+from sqlalchemy import func, select
+
+import models
+from shared_store import MemoryStore
+
+
+class EventBroker:
+    """In-process pub/sub fan-out for dashboard updates.
+
+    Each subscriber owns a bounded queue. Events are encoded once per publish, and a subscriber that
+    falls behind loses its oldest events instead of slowing down the publisher.
+    """
+
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._subscribers = set()
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.max_queue)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, event_type, payload):
+        if not self._subscribers:
+            return
+        frame = f"event: {event_type}\ndata: {json.dumps(payload)}\n\n"
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(frame)
+
+
+class LiveStats:
+    """Running status counts for push updates, seeded from the database on first use.
+
+    The counts live in a store (shared_store.py), so with several API workers every dashboard sees the same
+    numbers. They are re-seeded from the database every reseed_seconds to correct any drift.
+    """
+
+    PREFIX = "live_stats:"
+    SEEDED_KEY = "live_stats_seeded"
+
+    def __init__(self, store=None, reseed_seconds=300.0):
+        self.store = store or MemoryStore()
+        self.reseed_seconds = reseed_seconds
+        self.seeded = False
+        self._next_seed_check = 0.0
+
+    async def counts(self):
+        """Current counts by status, or None until they have been seeded."""
+        return await self.store.counters(self.PREFIX) if self.seeded else None
+
+    async def load(self, db):
+        """Seed the counts from the database unless another worker did so recently; returns whether this one did."""
+        seed = await self.store.add(self.SEEDED_KEY, 1, ttl=self.reseed_seconds)
+        self.seeded = True
+        if not seed:
+            return False
+        result = await db.execute(
+            select(models.Application.status, func.count(models.Application.id)).group_by(models.Application.status)
+        )
+        counts = dict(result.all())
+        # Statuses with no rows left (e.g. Processing once the queue drains) are reset too
+        for status in set(await self.store.counters(self.PREFIX)) | set(counts):
+            await self.store.set(self.PREFIX + status, counts.get(status, 0))
+        return True
+
+    async def record(self, db, statuses):
+        """Count newly finalized applications, all already committed, and return the delta applied per status."""
+        delta = {}
+        for status in statuses:
+            delta[status] = delta.get(status, 0) + 1
+        now = time.monotonic()
+        if now >= self._next_seed_check:
+            self._next_seed_check = now + self.reseed_seconds
+            if await self.load(db):
+                # The seeding query already sees every one of these rows, so none is added on top
+                return delta
+        for status, n in delta.items():
+            await self.store.incr(self.PREFIX + status, n)
+        return delta
@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+from metrics import GROUP_COMMIT_SECONDS, GROUP_COMMIT_SIZE
+
+
+class GroupCommitWriter:
+    """Runs database writes submitted by concurrent requests in shared transactions, one commit per group.
+
+    A write is an async callable taking a session. Writes arriving within window_ms of each other (or while the
+    previous group is committing) are executed in one transaction, so N concurrent requests pay for one commit
+    instead of N. Callers still only get their result after the commit, so nothing is acknowledged early.
+    """
+
+    def __init__(self, session_factory, window_ms=2.0, max_size=256):
+        self.session_factory = session_factory
+        self.window_ms = window_ms
+        self.max_size = max(1, max_size)
+        self._pending = []  # (operation, future)
+        self._task = None
+
+        self.groups = 0
+        self.writes = 0
+        self.max_observed_group = 0
+        self.retried_groups = 0
+
+    async def submit(self, operation):
+        """Run operation(session) in the next group transaction; returns its result once that is committed."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((operation, future))
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._drain())
+        return await future
+
+    async def _drain(self):
+        # One group at a time: SQLite has a single writer anyway, and later writes pile into the next group
+        while self._pending:
+            await asyncio.sleep(self.window_ms / 1000.0)
+            group, self._pending = self._pending[:self.max_size], self._pending[self.max_size:]
+            started = time.perf_counter()
+            await self._commit(group)
+            self.groups += 1
+            self.writes += len(group)
+            self.max_observed_group = max(self.max_observed_group, len(group))
+            GROUP_COMMIT_SECONDS.observe(time.perf_counter() - started)
+            GROUP_COMMIT_SIZE.observe(len(group))
+
+    async def _commit(self, group):
+        try:
+            async with self.session_factory() as db:
+                results = [await operation(db) for operation, _ in group]
+                await db.commit()
+        except Exception as e:
+            if len(group) > 1:
+                # One failing write (e.g. a duplicate idempotency key) must not fail the rest of its group
+                self.retried_groups += 1
+                for item in group:
+                    await self._commit([item])
+                return
+            future = group[0][1]
+            if not future.done():
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(group, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            "window_ms": self.window_ms,
+            "max_size": self.max_size,
+            "groups": self.groups,
+            "writes": self.writes,
+            "avg_group_size": round(self.writes / self.groups, 2) if self.groups else 0.0,
+            "max_observed_group": self.max_observed_group,
+            "retried_groups": self.retried_groups,
+        }
@@ -0,0 +1,39 @@
+"""Multi-worker deployment: gunicorn -c gunicorn.conf.py main:app
+
+The app (and with it the Decision Agent model) is imported once in the master process and forked into
+WEB_CONCURRENCY uvicorn workers, so the model's arrays are shared copy-on-write instead of loaded per worker.
+Workers agree on dashboard counters, dashboard events and idempotent responses through SHARED_STORE_URL
+(see shared_store.py); Prometheus metrics, the decision cache and the async apply queue stay per worker.
+"""
+import gc
+import os
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = os.getenv("BIND", "0.0.0.0:8000")
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+
+# Load the model at import (in the master) and score inline: each worker is already its own process, so a
+# per-worker thread or process pool would only add hand-offs. Explicit settings still win.
+os.environ.setdefault("DECISION_LOAD_MODE", "eager")
+os.environ.setdefault("DECISION_BACKEND", "inline")
+if workers > 1:
+    os.environ.setdefault("SHARED_STORE_URL", "sqlite:///" + os.path.join(PROJECT_DIR, "shared_store.db"))
+
+
+def when_ready(server):
+    # Everything the master allocated so far (model, modules) is moved out of the collector's generations,
+    # so collections in the workers don't touch those pages and un-share them
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Connections the master opened at import (create_all, migrations) must not be reused by the children
+    import database
+    database.engine.dispose(close=False)
+    database.async_engine.sync_engine.dispose(close=False)
+    database.read_engine.sync_engine.dispose(close=False)
@@ -0,0 +1,105 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+
+# Longest accepted Idempotency-Key header value
+MAX_KEY_LENGTH = 200
+
+
+def _normalized(fields):
+    return {
+        name: value.strip().lower() if isinstance(value, str) else float(value)
+        for name, value in fields.items()
+    }
+
+
+def request_key(header_value, fields, window=None):
+    """Idempotency key of an application: the client's Idempotency-Key, else a hash of the normalized form.
+
+    The hash also covers the window seconds long time slot the request arrives in, if given, so identical forms
+    only count as retries of each other within it (two submits either side of a slot boundary are both kept).
+    """
+    if header_value:
+        return f"key:{header_value.strip()}"
+    normalized = _normalized(fields)
+    if window:
+        normalized["_slot"] = int(time.time() // window)
+    return "sha256:" + hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+
+def request_fingerprint(fields):
+    """Hash of the normalized form, kept with a key's response: a retry is only replayed if its form matches."""
+    return hashlib.sha256(json.dumps(_normalized(fields), sort_keys=True).encode()).hexdigest()
+
+
+class IdempotencyIndex:
+    """Completed responses by idempotency key (bounded LRU) plus futures of requests still being processed.
+
+    The unique Application.idempotency_key column stays the source of truth; this only saves the round trip
+    for recent keys and lets concurrent duplicates share one pipeline run. With a shared store (several API
+    workers) completed responses are also kept there for ttl seconds, so a retry landing on another worker
+    still skips the database.
+    """
+
+    def __init__(self, max_size=10000, store=None, ttl=86400.0):
+        self.max_size = max_size
+        self.store = store
+        self.ttl = ttl
+        self._completed = OrderedDict()  # key -> (fingerprint, (status_code, content))
+        self._in_flight = {}  # key -> (fingerprint, Future[(status_code, content)])
+
+    async def get(self, key):
+        """(request fingerprint, response) stored for key, or None."""
+        found = self._completed.get(key)
+        if found is not None:
+            self._completed.move_to_end(key)
+        elif self.store is not None:
+            try:
+                stored = await self.store.get("idempotency:" + key)
+            except Exception as e:
+                # A miss: the request goes on to the database, which still finds a finalized duplicate
+                logging.getLogger(__name__).warning("Shared idempotency cache unavailable: %s", e)
+                stored = None
+            stored = json.loads(stored) if stored is not None else None
+            # Entries cached before fingerprints were kept are skipped; the database still answers for them
+            if isinstance(stored, dict):
+                found = stored["fingerprint"], (stored["status_code"], stored["content"])
+                self._remember_local(key, found)
+        return found
+
+    def in_flight(self, key):
+        """(request fingerprint, future of its response) of the request running for key, or None."""
+        return self._in_flight.get(key)
+
+    def begin(self, key, fingerprint):
+        """Register a request for key; a request already in flight keeps its future, which is returned instead."""
+        if key not in self._in_flight:
+            self._in_flight[key] = fingerprint, asyncio.get_running_loop().create_future()
+        return self._in_flight[key][1]
+
+    async def finish(self, key, fingerprint, response, remember=True):
+        """Hand the response to waiting duplicates and, unless it should be retried, keep it for later ones."""
+        _, future = self._in_flight.pop(key, (None, None))
+        if future is not None and not future.done():
+            future.set_result(response)
+        if remember:
+            await self.remember(key, fingerprint, response)
+
+    async def remember(self, key, fingerprint, response):
+        self._remember_local(key, (fingerprint, response))
+        if self.store is not None:
+            status_code, content = response
+            stored = json.dumps({"fingerprint": fingerprint, "status_code": status_code, "content": content})
+            try:
+                await self.store.set("idempotency:" + key, stored, ttl=self.ttl)
+            except Exception as e:
+                logging.getLogger(__name__).warning("Shared idempotency cache unavailable: %s", e)
+
+    def _remember_local(self, key, found):
+        self._completed[key] = found
+        self._completed.move_to_end(key)
+        while len(self._completed) > self.max_size:
+            self._completed.popitem(last=False)
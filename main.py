@@ -1,22 +1,101 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, Query, Request, Header
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse, StreamingResponse
+import asyncio
+import hmac
+import json
+import logging
 import os
 import uuid
 import datetime
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
 
-from sqlalchemy.orm import Session
-from database import engine, get_db, Base
+from sqlalchemy import func, insert, inspect, select, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import engine, async_engine, read_engine, get_db, get_read_db, Base, SessionLocal, AsyncSessionLocal
 import models
+import config
+import analytics
+from events import EventBroker, LiveStats
+from metrics import APPLICATIONS, IDEMPOTENT_REPLAYS, GaugeFunction, StageTimer, render as render_metrics
+from admission import AdmissionController, Rejected
+from decision_queue import DecisionQueue
+from event_log import DecisionEventLog, SampledAccessLog
+from group_commit import GroupCommitWriter
+from idempotency import (
+    IdempotencyIndex, MAX_KEY_LENGTH as MAX_IDEMPOTENCY_KEY_LENGTH, request_fingerprint, request_key
+)
+from shared_store import open_store
 
-from agents.intake_agent import IntakeAgent
+from agents.intake_agent import IntakeAgent, APPLICANT_FIELDS, FINANCIAL_FIELDS
 from agents.validation_agent import ValidationAgent
-from agents.decision_agent import DecisionAgent
+from agents.decision_agent import DecisionAgent, FEATURE_COLUMNS
 
 # Create database tables
+seed_rollup = not inspect(engine).has_table(models.ApplicationRollup.__tablename__)
 Base.metadata.create_all(bind=engine)
+# create_all skips columns and indexes added to tables that already exist
+existing_columns = {column["name"] for column in inspect(engine).get_columns(models.Application.__tablename__)}
+for column in models.Application.__table__.columns:
+    if column.name not in existing_columns:
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"ALTER TABLE {models.Application.__tablename__} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+            ))
+for index in models.Application.__table__.indexes:
+    index.create(bind=engine, checkfirst=True)
+if seed_rollup:
+    # First start with the analytics rollup: fold in the applications finalized before it existed
+    with SessionLocal() as session:
+        analytics.rebuild(session)
 
-app = FastAPI(title="Autonomous Loan Origination Agentic System")
+intake_agent = IntakeAgent()
+validation_agent = ValidationAgent()
+# In background mode the model is loaded by the lifespan below, so importing this module stays cheap
+decision_agent = DecisionAgent(lazy=config.DECISION_LOAD_MODE == "background")
+
+@asynccontextmanager
+async def lifespan(app):
+    warm_up = asyncio.ensure_future(decision_agent.start())
+    if config.DECISION_LOAD_MODE != "background":
+        await warm_up
+    # Picks up models that train_model.py (or the registry CLI) activates while the server is running
+    watcher = asyncio.ensure_future(decision_agent.watch(config.MODEL_WATCH_SECONDS)) if config.MODEL_WATCH_SECONDS > 0 else None
+    relay = asyncio.ensure_future(relay_dashboard_events()) if shared_store.shared else None
+    if config.APPLY_MODE == "async":
+        # Applications accepted before the last shutdown but never decided go back on the queue. With several
+        # workers only the first to start in a minute does this; finalizing only updates rows still Processing,
+        # so an application queued twice is still decided once.
+        if not shared_store.shared or await shared_store.add("decision_queue_recovery", os.getpid(), ttl=60):
+            async with AsyncSessionLocal() as db:
+                pending = await db.execute(
+                    select(models.Application.id).where(models.Application.status == models.PROCESSING).order_by(models.Application.id)
+                )
+                for app_id in pending.scalars():
+                    decision_queue.put(app_id)
+        decision_queue.start()
+    if event_log is not None:
+        event_log.start()
+    access_log = logging.getLogger("uvicorn.access")
+    access_log.addFilter(access_log_filter)
+    yield
+    await decision_queue.stop()
+    if relay:
+        relay.cancel()
+    access_log.removeFilter(access_log_filter)
+    if event_log is not None:
+        await event_log.close()
+    warm_up.cancel()
+    if watcher:
+        watcher.cancel()
+    decision_agent.shutdown()
+    await async_engine.dispose()
+    await read_engine.dispose()
+
+app = FastAPI(title="Autonomous Loan Origination Agentic System", lifespan=lifespan)
 
 # Ensure static directory exists
 os.makedirs("static", exist_ok=True)
@@ -24,9 +103,57 @@ os.makedirs("static", exist_ok=True)
 # Mount the static directory
 app.mount("/static", StaticFiles(directory="static", html=True), name="static")
 
-intake_agent = IntakeAgent()
-validation_agent = ValidationAgent()
-decision_agent = DecisionAgent()
+# Fan-out of finalized decisions to dashboards subscribed to /api/dashboard/stream
+broker = EventBroker(max_queue=config.SSE_QUEUE_SIZE)
+# Counters, dashboard events and idempotent responses that every API worker process has to agree on
+shared_store = open_store(config.SHARED_STORE_URL)
+live_stats = LiveStats(shared_store, reseed_seconds=config.LIVE_STATS_RESEED_SECONDS)
+
+# Gauges for /metrics, evaluated only when scraped
+GaugeFunction("loan_decision_queue_depth", "Rows waiting in or being scored by the Decision Agent micro-batcher.",
+              lambda: decision_agent.scorer.queue_depth if decision_agent.scorer else 0)
+GaugeFunction("loan_apply_queue_depth", "Applications accepted in async mode and not decided yet.",
+              lambda: decision_queue.depth)
+GaugeFunction("loan_dashboard_subscribers", "Open dashboard Server-Sent Events streams.", lambda: broker.subscriber_count)
+
+# Recent /api/apply responses by idempotency key, and requests with a key still in progress
+# (the in-progress set stays per process; the shared store makes stored responses visible to the other workers)
+idempotency_index = IdempotencyIndex(
+    max_size=config.IDEMPOTENCY_CACHE_SIZE,
+    store=shared_store if shared_store.shared else None,
+    ttl=config.IDEMPOTENCY_TTL_SECONDS
+)
+
+# Bounds concurrent submissions and turns bursts away with 429/503 (see admission.py); reads never wait on it
+admission = AdmissionController(
+    max_concurrency=config.APPLY_MAX_CONCURRENCY,
+    max_queued=config.APPLY_MAX_QUEUED,
+    queue_timeout=config.APPLY_QUEUE_TIMEOUT_SECONDS,
+    target_p99_ms=config.APPLY_TARGET_P99_MS,
+    window=config.APPLY_LATENCY_WINDOW
+) if config.APPLY_MAX_CONCURRENCY > 0 else None
+GaugeFunction("loan_apply_in_flight", "Submissions admitted and running the pipeline.",
+              lambda: admission.active if admission else 0)
+GaugeFunction("loan_apply_waiting", "Submissions waiting for an admission slot.",
+              lambda: admission.waiting if admission else 0)
+
+# Coalesces /api/apply writes of concurrent requests into shared transactions (DB_GROUP_COMMIT_MS > 0)
+group_writer = GroupCommitWriter(
+    AsyncSessionLocal, window_ms=config.DB_GROUP_COMMIT_MS, max_size=config.DB_GROUP_COMMIT_MAX_SIZE
+) if config.DB_GROUP_COMMIT_MS > 0 else None
+
+# One structured record per decided application (see event_log.py); poll endpoints only get sampled access logs
+event_log = DecisionEventLog(
+    config.DECISION_LOG_DIR,
+    buffer_size=config.DECISION_LOG_BUFFER,
+    flush_seconds=config.DECISION_LOG_FLUSH_SECONDS,
+    segment_bytes=int(config.DECISION_LOG_SEGMENT_MB * 1024 * 1024),
+    max_segments=config.DECISION_LOG_MAX_SEGMENTS
+) if config.DECISION_LOG_DIR else None
+access_log_filter = SampledAccessLog(every=config.ACCESS_LOG_POLL_SAMPLE_EVERY)
+
+# Application status -> dashboard stats key
+STAT_KEYS = {"Approved": "approved", "Rejected": "denied", "Error": "review"}
 
 def generate_app_id():
     return f"APP-{datetime.datetime.now().strftime('%y%m%d')}-{str(uuid.uuid4())[:4].upper()}"
@@ -46,48 +173,376 @@ async def get_dashboard():
         "Expires": "0"
     })
 
+def format_application(app):
+    """Shape an Application row for the dashboard."""
+    safe_income = float(app.annual_income) if app.annual_income and float(app.annual_income) > 0 else 1.0
+    dti_val = (float(app.loan_amount) / safe_income) * 100 if app.loan_amount else 0
+    rate = "6.875% APR" if app.status == "Approved" else "N/A"
+    initials = f"{app.first_name[0]}{app.last_name[0]}".upper() if app.first_name and app.last_name else "??"
+
+    return {
+        "app_id": app.id,
+        "initials": initials,
+        "name": f"{app.first_name} {app.last_name}",
+        "id": f"APP-{app.id:04d}",
+        "amt": format_currency(float(app.loan_amount)) if app.loan_amount else "$0",
+        "type": "PERSONAL",
+        "dti": f"{dti_val:.1f}%",
+        "score": app.credit_score,
+        "decision": app.status.upper() if app.status else "UNKNOWN",
+        "rate": rate,
+        "desc": f"Confidence: {app.confidence:.1f}% · {format_currency(float(app.loan_amount))} · {app.first_name}",
+        "label": f"APP-{app.id:04d}",
+        "created_at": "Today"
+    }
+
+def queue_depth():
+    """Applications accepted but not decided yet: the async decision queue, or rows in the model micro-batcher."""
+    if config.APPLY_MODE == "async":
+        return decision_queue.depth
+    return decision_agent.scorer.queue_depth if decision_agent.scorer else 0
+
+def stats_from_counts(counts):
+    stats = {key: counts.get(status, 0) for status, key in STAT_KEYS.items()}
+    stats["queue"] = queue_depth()
+    stats["total_processed"] = sum(counts.get(status, 0) for status in STAT_KEYS)
+    return stats
+
+async def get_dashboard_stats(db: AsyncSession):
+    # Status counts come from one GROUP BY (served by the status index) instead of scanning rows in Python
+    result = await db.execute(
+        select(models.Application.status, func.count(models.Application.id)).group_by(models.Application.status)
+    )
+    return stats_from_counts(dict(result.all()))
+
 @app.get("/api/dashboard-data")
-async def get_dashboard_data(db: Session = Depends(get_db)):
-    db_apps = db.query(models.Application).order_by(models.Application.id.desc()).all()
-    
-    approved = sum(1 for a in db_apps if a.status == "Approved")
-    denied = sum(1 for a in db_apps if a.status == "Rejected")
-    error = sum(1 for a in db_apps if a.status == "Error")
-    
-    # Format for the frontend dashboard
-    formatted_apps = []
-    for app in db_apps:
-        safe_income = float(app.annual_income) if app.annual_income and float(app.annual_income) > 0 else 1.0
-        dti_val = (float(app.loan_amount) / safe_income) * 100 if app.loan_amount else 0
-        rate = "6.875% APR" if app.status == "Approved" else "N/A"
-        initials = f"{app.first_name[0]}{app.last_name[0]}".upper() if app.first_name and app.last_name else "??"
-        
-        formatted_apps.append({
-            "initials": initials,
-            "name": f"{app.first_name} {app.last_name}",
-            "id": f"APP-{app.id:04d}",
-            "amt": format_currency(float(app.loan_amount)) if app.loan_amount else "$0",
-            "type": "PERSONAL",
-            "dti": f"{dti_val:.1f}%",
-            "score": app.credit_score,
-            "decision": app.status.upper() if app.status else "UNKNOWN",
-            "rate": rate,
-            "desc": f"Confidence: {app.confidence:.1f}% · {format_currency(float(app.loan_amount))} · {app.first_name}",
-            "label": f"APP-{app.id:04d}",
-            "created_at": "Today"
-        })
-    
+async def get_dashboard_data(db: AsyncSession = Depends(get_read_db)):
+    # Full snapshot kept for existing consumers; the dashboard itself uses /api/dashboard/feed
+    result = await db.execute(select(models.Application).order_by(models.Application.id.desc()))
+    db_apps = result.scalars().all()
+
+    return {
+        "stats": await get_dashboard_stats(db),
+        "applications": [format_application(app) for app in db_apps]
+    }
+
+# Most rows still Processing whose final status one feed poll re-reads (the client sends its newest ones)
+FEED_MAX_PENDING = 100
+
+@app.get("/api/dashboard/feed")
+async def get_dashboard_feed(
+    since_id: Optional[int] = None,
+    before_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=500),
+    pending: List[int] = Query([]),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Incremental dashboard data, newest first, paginated with keyset cursors on Application.id.
+
+    since_id returns only rows after the client's last poll; before_id pages back through older rows. The cursor
+    always advances to the newest row returned; rows the client saw still Processing are passed back as pending
+    ids (at most FEED_MAX_PENDING) and come back in "updated" with their current status.
+    """
+    query = select(models.Application).order_by(models.Application.id.desc()).limit(limit + 1)
+    if since_id is not None:
+        query = query.where(models.Application.id > since_id)
+    if before_id is not None:
+        query = query.where(models.Application.id < before_id)
+    page = (await db.execute(query)).scalars().all()
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    updated = []
+    if pending:
+        # A row stuck in Processing (e.g. a worker crashed mid-decision) costs one lookup, not an ever-wider range
+        query = select(models.Application).where(models.Application.id.in_(pending[:FEED_MAX_PENDING]))
+        updated = (await db.execute(query)).scalars().all()
+
     return {
-        "stats": {
-            "approved": approved,
-            "denied": denied,
-            "review": error,
-            "queue": 0,
-            "total_processed": len(db_apps)
-        },
-        "applications": formatted_apps
+        "stats": await get_dashboard_stats(db),
+        "applications": [format_application(app) for app in page],
+        "updated": [format_application(app) for app in updated],
+        "since_id": page[0].id if page and before_id is None else since_id,
+        "next_before_id": page[-1].id if has_more else None
     }
 
+@app.get("/api/analytics")
+async def get_analytics(db: AsyncSession = Depends(get_read_db)):
+    """Approval rate and average confidence by credit score band, DTI bucket, employment, housing and loan term.
+
+    Served from the application_rollup table, so the cost doesn't grow with the number of applications.
+    """
+    return await analytics.report(db)
+
+@app.get("/api/dashboard/stream")
+async def stream_dashboard(request: Request):
+    """Server-Sent Events stream of finalized applications with updated stats, replacing dashboard polling."""
+    queue = broker.subscribe()
+
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(queue.get(), timeout=config.SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    frame = ": keep-alive\n\n"
+                yield frame
+        finally:
+            broker.unsubscribe(queue)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+def log_decision(endpoint, application, status_code, timer: StageTimer):
+    """Queue the decision-event record of a finalized application."""
+    if event_log is None:
+        return
+    event_log.record({
+        "ts": round(time.time(), 3),
+        "endpoint": endpoint,
+        "application_id": application.id,
+        "features": [getattr(application, column) for column in FEATURE_COLUMNS],
+        "status": application.status,
+        "status_code": status_code,
+        "confidence": application.confidence,
+        "model_version": application.model_version,
+        "stages_ms": {name: round(seconds * 1000, 3) for name, seconds in timer.stages}
+    })
+
+async def publish_decisions(db: AsyncSession, applications):
+    """Push finalized applications and the stats change to dashboard subscribers.
+
+    Call it once per commit with every application that commit finalized, so a reseed of the counts (which
+    already sees all of them) is never topped up by the rest of the batch.
+    """
+    if not applications:
+        return
+    if not shared_store.shared and not live_stats.seeded and not broker.subscriber_count:
+        # Nobody listening yet; counts are seeded from the database when the first event is sent.
+        # With several workers the dashboard may be connected to another one, so every decision is published.
+        return
+    try:
+        await live_stats.record(db, [application.status for application in applications])
+        stats = stats_from_counts(await live_stats.counts())
+    except Exception as e:
+        # Dashboard updates are best effort: the decisions are committed, and the next reseed fixes the counts
+        logging.getLogger(__name__).warning("Dashboard update skipped, shared stats unavailable: %s", e)
+        return
+    for application in applications:
+        event = {
+            "application": format_application(application),
+            "stats": stats,
+            "stats_delta": {
+                STAT_KEYS.get(application.status, application.status): 1,
+                "total_processed": 1 if application.status in STAT_KEYS else 0
+            }
+        }
+        broker.publish("application", event)
+        if shared_store.shared:
+            try:
+                await shared_store.append_event("application", json.dumps(event))
+            except Exception as e:
+                logging.getLogger(__name__).warning("Shared dashboard events unavailable: %s", e)
+
+async def relay_dashboard_events():
+    """Forward dashboard events published by the other API workers to this worker's subscribers."""
+    cursor = None
+    pid = os.getpid()
+    while True:
+        events = []
+        try:
+            if cursor is None:
+                # Only events published from now on are relayed
+                cursor = await shared_store.latest_cursor()
+            else:
+                cursor, events = await shared_store.events_since(cursor)
+        except Exception as e:
+            logging.getLogger(__name__).warning("Shared dashboard events unavailable: %s", e)
+        for origin, event_type, payload in events:
+            if origin != pid:
+                broker.publish(event_type, json.loads(payload))
+        await asyncio.sleep(config.SHARED_EVENTS_POLL_SECONDS)
+
+@app.get("/metrics")
+async def get_metrics():
+    # Prometheus scrape endpoint: per-stage latency histograms, model batching and queue depth
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/ready")
+async def get_readiness():
+    # 503 until the Decision Agent model is loaded and warmed up; static pages and the dashboard are served before that
+    readiness = decision_agent.readiness()
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    # Without a configured token the admin API does not exist, rather than being open to anyone
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest((x_admin_token or "").encode(), config.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.get("/api/admin/model", dependencies=[Depends(require_admin)])
+async def get_model_info():
+    """Served model, shadow comparison and the versions available in the registry."""
+    registry = decision_agent.registry
+    return {
+        "active": decision_agent.active.metadata if decision_agent.active else None,
+        "registry_current": registry.current(),
+        "versions": await asyncio.to_thread(registry.versions),
+        "shadow": decision_agent.shadow_stats.stats() if decision_agent.shadow_stats else None,
+        "readiness": decision_agent.readiness()
+    }
+
+@app.post("/api/admin/model/reload", dependencies=[Depends(require_admin)])
+async def reload_model(version: Optional[str] = None):
+    """Hot-swap the Decision Agent model without a restart, optionally to another registry version, which becomes
+    the active one only once it is loaded and warmed up."""
+    try:
+        metadata = await decision_agent.reload(version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": f"Model reload failed, still serving the previous model: {e}"})
+    return {"active": metadata, "reloads": decision_agent.reloads}
+
+@app.post("/api/admin/model/shadow", dependencies=[Depends(require_admin)])
+async def set_shadow_model(version: Optional[str] = None):
+    """Score live traffic with a second registry version for comparison; omit version to stop."""
+    try:
+        await decision_agent.set_shadow(version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    return {"shadow_version": decision_agent.shadow_version}
+
+@app.get("/api/decision-stats")
+async def get_decision_stats():
+    # Micro-batching knobs and observed throughput / queueing latency of the Decision Agent
+    stats = decision_agent.batch_stats()
+    if config.APPLY_MODE == "async":
+        stats["apply_queue"] = decision_queue.stats()
+    if group_writer is not None:
+        stats["group_commit"] = group_writer.stats()
+    if event_log is not None:
+        stats["event_log"] = event_log.stats()
+    if admission is not None:
+        stats["admission"] = admission.stats()
+    return stats
+
+async def write(db: AsyncSession, operation):
+    """Run operation(session) and commit it: in a group commit when enabled, else on the request's own session."""
+    if group_writer is not None:
+        return await group_writer.submit(operation)
+    result = await operation(db)
+    await db.commit()
+    return result
+
+async def insert_application(db: AsyncSession, values):
+    result = await db.execute(insert(models.Application).values(**values).returning(models.Application.id))
+    return result.scalar_one()
+
+async def finalize_application(db: AsyncSession, application, record_analytics=True):
+    """Persist a finalized application with one UPDATE, unless the row already left Processing; returns whether
+    it did."""
+    result = await db.execute(
+        update(models.Application)
+        .where(models.Application.id == application.id, models.Application.status == models.PROCESSING)
+        .values(
+            status=application.status,
+            confidence=application.confidence,
+            remarks=application.remarks,
+            model_version=application.model_version,
+            idempotency_key=application.idempotency_key,
+            response=application.response
+        )
+    )
+    if result.rowcount and record_analytics:
+        # Rollup counters are updated in the same transaction as the final status
+        await analytics.record(db, [application])
+    return bool(result.rowcount)
+
+async def process_application(fields, key, db: AsyncSession, timer: StageTimer):
+    """Run one application through the agents and persist it; returns (status_code, response content).
+
+    Raises IntegrityError from the initial INSERT when another request already holds the idempotency key.
+    """
+    values = dict(fields, status=models.PROCESSING, confidence=0.0, remarks="", idempotency_key=key)
+    # DB Record Init: the only INSERT for this application
+    with timer.stage("db_insert"):
+        app_id = await write(db, lambda session: insert_application(session, values))
+    # Finalized in memory, then persisted with a single UPDATE
+    new_app = models.Application(id=app_id, **values)
+
+    try:
+        # Phase 1: Intake
+        with timer.stage("intake"):
+            intake_data = await intake_agent.process(**fields)
+        
+        # Phase 2: Validation
+        with timer.stage("validation"):
+            validation_result = await validation_agent.validate(intake_data)
+        if not validation_result.get("is_valid"):
+            remarks = validation_result.get("remarks")
+            status_code = 400
+            content = {"status": "Rejected", "remarks": remarks, "stage": "Validation Agent", "metrics": {}}
+            new_app.transition("Rejected", confidence=0.0, remarks=remarks)
+        else:
+            # Phase 3: Decision
+            with timer.stage("decision"):
+                decision = await decision_agent.decide(intake_data, validation_result)
+            status_code = 200
+            content = decision_content(decision)
+            new_app.transition(decision.application_status, confidence=decision.confidence,
+                               remarks=decision.remarks, model_version=decision.model_version)
+
+        # Finalize the same row with a single UPDATE
+        if key is not None:
+            # Kept with the row so retries are answered from it, even by another worker or after a restart
+            new_app.response = json.dumps({"status_code": status_code, "content": content})
+        with timer.stage("db_update"):
+            await write(db, lambda session: finalize_application(session, new_app))
+        with timer.stage("publish"):
+            await publish_decisions(db, [new_app])
+        APPLICATIONS.inc("apply", new_app.status)
+        log_decision("apply", new_app, status_code, timer)
+        return status_code, content
+
+    except Exception as e:
+        # Don't leave an already inserted application stuck in Processing
+        await db.rollback()
+        failed = models.Application(id=app_id, **values)
+        failed.transition("Error", remarks=str(e))
+        # Release the key so a retry runs the pipeline again instead of replaying the failure
+        failed.idempotency_key = None
+        if await write(db, lambda session: finalize_application(session, failed)):
+            await publish_decisions(db, [failed])
+            APPLICATIONS.inc("apply", "Error")
+            log_decision("apply", failed, 500, timer)
+        return 500, {"error": str(e)}
+
+async def stored_response(db: AsyncSession, key):
+    """(request fingerprint, (status_code, content)) of the application finalized under key, or None if it isn't
+    finalized."""
+    result = await db.execute(select(models.Application).where(models.Application.idempotency_key == key))
+    application = result.scalar()
+    if application is None or application.response is None:
+        return None
+    stored = json.loads(application.response)
+    fingerprint = request_fingerprint(
+        {name: getattr(application, name) for name in APPLICANT_FIELDS + [name for name, _ in FINANCIAL_FIELDS]}
+    )
+    return fingerprint, (stored["status_code"], stored["content"])
+
+def key_reused_response(timer: StageTimer):
+    """422 for a request whose Idempotency-Key was already used with a different form."""
+    return JSONResponse(status_code=422, content={
+        "error": "This Idempotency-Key was already used for a different application."
+    }, headers={"Server-Timing": timer.server_timing()})
+
 @app.post("/api/apply")
 async def apply_loan(
     first_name: str = Form(...),
@@ -99,90 +554,328 @@ async def apply_loan(
     employment_status: int = Form(...),
     housing_status: int = Form(...),
     loan_term: int = Form(...),
-    db: Session = Depends(get_db)
+    idempotency_key: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
 ):
+    """Submit one application.
+
+    Retries with the same Idempotency-Key header (or, with IDEMPOTENCY_CONTENT_HASH=1, the same form contents
+    within a few minutes) get the first request's response, marked with Idempotent-Replayed, instead of creating
+    another application. A retry whose form differs from the one first sent under its key gets 422.
+    """
+    timer = StageTimer("apply")
+    fields = {
+        "first_name": first_name,
+        "last_name": last_name,
+        "email": email,
+        "annual_income": annual_income,
+        "loan_amount": loan_amount,
+        "credit_score": credit_score,
+        "employment_status": employment_status,
+        "housing_status": housing_status,
+        "loan_term": loan_term
+    }
+    if idempotency_key is not None and not 0 < len(idempotency_key.strip()) <= MAX_IDEMPOTENCY_KEY_LENGTH:
+        return JSONResponse(status_code=400, content={
+            "error": f"Idempotency-Key must be 1 to {MAX_IDEMPOTENCY_KEY_LENGTH} characters."
+        })
+    key = request_key(idempotency_key, fields, window=config.IDEMPOTENCY_CONTENT_WINDOW_SECONDS) \
+        if idempotency_key or config.IDEMPOTENCY_CONTENT_HASH else None
+
+    # Replays need the same form as the request that used the key first; another form under it gets 422
+    fingerprint = request_fingerprint(fields)
+    if key is not None:
+        found, source = await idempotency_index.get(key), "memory"
+        if found is None:
+            found, source = idempotency_index.in_flight(key), "in_flight"
+        if found is not None:
+            used_for, replay = found
+            if used_for != fingerprint:
+                return key_reused_response(timer)
+            if source == "in_flight":
+                # Same request already running here: share its result instead of scoring it twice
+                replay = await asyncio.shield(replay)
+            return replay_response(replay, source, timer)
+    # Replays above are cheap and always answered; everything past here needs a slot
+    if admission is not None:
+        try:
+            admitted_at = await admission.acquire("apply")
+        except Rejected as e:
+            return shed_response(e, timer)
+        found = idempotency_index.in_flight(key) if key is not None else None
+        if found is not None:
+            # A duplicate got its slot while this one waited for one: give the slot back and share its result
+            admission.release(admitted_at)
+            used_for, pending = found
+            if used_for != fingerprint:
+                return key_reused_response(timer)
+            return replay_response(await asyncio.shield(pending), "in_flight", timer)
+    if key is not None:
+        # Nothing awaited since the in-flight check above, so no duplicate can register in between
+        idempotency_index.begin(key, fingerprint)
+
+    response, source = None, None
     try:
-        # DB Record Init
+        if config.APPLY_MODE == "async":
+            response = await enqueue_application(fields, key, db, timer)
+        else:
+            response = await process_application(fields, key, db, timer)
+    except IntegrityError:
+        # The key is already taken by a row committed earlier or by another worker
+        await db.rollback()
+        stored = await stored_response(db, key)
+        if stored is None:
+            response = (409, {"error": "An application with this idempotency key is still being processed."})
+        elif stored[0] != fingerprint:
+            response = (422, {"error": "This Idempotency-Key was already used for a different application."})
+        else:
+            response, source = stored[1], "database"
+    except Exception as e:
+        response = (500, {"error": str(e)})
+    finally:
+        if admission is not None:
+            admission.release(admitted_at)
+        if key is not None:
+            status_code = response[0] if response else 500
+            await idempotency_index.finish(key, fingerprint, response or (500, {"error": "Request aborted."}),
+                                           remember=status_code not in (202, 409, 422, 500, 503))
+
+    if source is not None and response[0] != 409:
+        return replay_response(response, source, timer)
+    status_code, content = response
+    headers = {"Server-Timing": timer.server_timing()}
+    if status_code in (409, 503):
+        headers["Retry-After"] = "1"
+    return JSONResponse(status_code=status_code, content=content, headers=headers)
+
+def shed_response(rejected: Rejected, timer: StageTimer):
+    """429 / 503 for a submission that admission control turned away."""
+    message = "Too many applications waiting" if rejected.reason == "queue_full" else "Server overloaded"
+    return JSONResponse(status_code=rejected.status_code, content={
+        "error": f"{message}, retry in {rejected.retry_after} s."
+    }, headers={"Retry-After": str(rejected.retry_after), "Server-Timing": timer.server_timing()})
+
+def accepted(app_id):
+    return {"application_id": app_id, "status": models.PROCESSING, "status_url": f"/api/applications/{app_id}"}
+
+async def enqueue_application(fields, key, db: AsyncSession, timer: StageTimer):
+    """Async mode: persist the application as Processing and queue it for the decision workers; returns 202."""
+    if decision_queue.full():
+        return 503, {"error": "Too many applications waiting for a decision, retry shortly."}
+    with timer.stage("db_insert"):
         new_app = models.Application(
-            first_name=first_name,
-            last_name=last_name,
-            email=email,
-            annual_income=annual_income,
-            loan_amount=loan_amount,
-            credit_score=credit_score,
-            employment_status=employment_status,
-            housing_status=housing_status,
-            loan_term=loan_term,
-            status="Processing",
+            **fields,
+            status=models.PROCESSING,
             confidence=0.0,
-            remarks=""
+            remarks="",
+            idempotency_key=key
         )
         db.add(new_app)
-        db.commit()
-        db.refresh(new_app)
+        await db.flush()
+        content = accepted(new_app.id)
+        # Retries get the 202 until a worker replaces it with the decision
+        new_app.response = json.dumps({"status_code": 202, "content": content})
+        await db.commit()
+    decision_queue.put(new_app.id)
+    return 202, content
 
-        # Phase 1: Intake
-        intake_data = await intake_agent.process(
-            first_name=first_name,
-            last_name=last_name,
-            email=email,
-            annual_income=annual_income,
-            loan_amount=loan_amount,
-            credit_score=credit_score,
-            employment_status=employment_status,
-            housing_status=housing_status,
-            loan_term=loan_term
-        )
-        
-        # Phase 2: Validation
-        validation_result = await validation_agent.validate(intake_data)
-        if not validation_result.get("is_valid"):
-            decision_label = "REJECTED"
-            remarks = validation_result.get("remarks")
-            status_code = 400
-            stage = "Validation Agent"
+async def process_queued(ids):
+    """Decision queue handler: run a batch of Processing applications through the agents and finalize them."""
+    timer = StageTimer("apply_queue")
+    query = select(models.Application).where(
+        models.Application.id.in_(ids), models.Application.status == models.PROCESSING
+    )
+    async with AsyncSessionLocal() as db:
+        applications = (await db.execute(query)).scalars().all()
+        if not applications:
+            return
+        # Detached: rows are persisted by finalize_application, only if another worker hasn't decided them already
+        db.expunge_all()
+        try:
+            records = [
+                {name: getattr(application, name) for name in APPLICANT_FIELDS + [name for name, _ in FINANCIAL_FIELDS]}
+                for application in applications
+            ]
+            with timer.stage("intake"):
+                intake = await intake_agent.process_batch(records)
+            with timer.stage("validation"):
+                validation = await validation_agent.validate_batch(intake)
+            with timer.stage("decision"):
+                decisions = await decision_agent.decide_batch(intake, validation)
+
+            for application, error, remarks, decision in zip(applications, intake["errors"], validation["remarks"], decisions):
+                result, row = batch_outcome(error, remarks, decision)
+                application.transition(row["status"], confidence=row["confidence"], remarks=row["remarks"],
+                                       model_version=row["model_version"])
+                application.response = json.dumps({"status_code": result.pop("status_code"), "content": result})
+            with timer.stage("db_update"):
+                applications = [application for application in applications
+                                if await finalize_application(db, application, record_analytics=False)]
+                await analytics.record(db, applications)
+                await db.commit()
+        except Exception as e:
+            # Same as the inline path: no application is left stuck in Processing
+            await db.rollback()
+            applications = (await db.execute(query)).scalars().all()
+            db.expunge_all()
+            for application in applications:
+                application.transition("Error", remarks=str(e))
+                application.idempotency_key = None
+                application.response = json.dumps({"status_code": 500, "content": {"error": str(e)}})
+            applications = [application for application in applications
+                            if await finalize_application(db, application, record_analytics=False)]
+            await analytics.record(db, applications)
+            await db.commit()
+
+        with timer.stage("publish"):
+            for application in applications:
+                APPLICATIONS.inc("apply_queue", application.status)
+            await publish_decisions(db, applications)
+    timer.server_timing()  # records the batch total in STAGE_SECONDS
+    for application in applications:
+        log_decision("apply_queue", application, json.loads(application.response)["status_code"], timer)
+
+decision_queue = DecisionQueue(
+    process_queued,
+    workers=config.DECISION_QUEUE_WORKERS,
+    batch_size=config.DECISION_QUEUE_BATCH_SIZE,
+    max_size=config.DECISION_QUEUE_MAX_SIZE
+)
+
+@app.get("/api/applications/{app_id}")
+async def get_application(app_id: int, db: AsyncSession = Depends(get_read_db)):
+    """Status of one application; "result" holds the response of /api/apply once it has been decided."""
+    application = await db.get(models.Application, app_id)
+    if application is None:
+        raise HTTPException(status_code=404, detail=f"Application {app_id} not found")
+    decided = application.status != models.PROCESSING and application.response
+    return {
+        "application_id": application.id,
+        "status": application.status,
+        "confidence": application.confidence,
+        "remarks": application.remarks,
+        "model_version": application.model_version,
+        "result": json.loads(application.response) if decided else None
+    }
+
+def replay_response(response, source, timer: StageTimer):
+    IDEMPOTENT_REPLAYS.inc(source)
+    status_code, content = response
+    return JSONResponse(status_code=status_code, content=content, headers={
+        "Idempotent-Replayed": "true",
+        "Server-Timing": timer.server_timing()
+    })
+
+def decision_content(decision):
+    """Response body for an application the Decision Agent decided."""
+    return {
+        "status": decision.status,
+        "remarks": decision.remarks,
+        "stage": "Decision Agent",
+        "metrics": decision.metrics,
+        "reason_codes": list(decision.reason_codes),
+        "contributions": decision.contributions
+    }
+
+def batch_outcome(error, validation_remarks, decision):
+    """Response fields and finalized row values of one batched application, from its intake error, validation
+    remarks and decision (None when it failed validation)."""
+    if error is not None:
+        result = {"status": "Rejected", "remarks": error, "stage": "Intake Agent", "status_code": 422, "metrics": {}}
+        return result, {"status": "Rejected", "confidence": 0.0, "remarks": error, "model_version": None}
+    if decision is None:
+        result = {"status": "Rejected", "remarks": validation_remarks, "stage": "Validation Agent",
+                  "status_code": 400, "metrics": {}}
+        return result, {"status": "Rejected", "confidence": 0.0, "remarks": validation_remarks, "model_version": None}
+    result = {"status_code": 200, **decision_content(decision)}
+    return result, {
+        "status": decision.application_status,
+        "confidence": decision.confidence,
+        "remarks": decision.remarks,
+        "model_version": decision.model_version
+    }
+
+@app.post("/api/apply/batch")
+async def apply_loan_batch(request: Request, db: AsyncSession = Depends(get_db)):
+    """Submit many applications at once as a JSON array or NDJSON (Content-Type: application/x-ndjson).
+
+    Intake and validation run vectorized over the batch, every valid row is scored with one model call and
+    all results are persisted with a single bulk INSERT. Returns one result per submitted item, in order.
+    """
+    body = await request.body()
+    try:
+        if "ndjson" in request.headers.get("content-type", ""):
+            records = [json.loads(line) for line in body.splitlines() if line.strip()]
         else:
-            # Phase 3: Decision
-            decision_result = await decision_agent.decide(intake_data, validation_result)
-            decision_label = decision_result.get("status").upper()
-            if decision_label == "SUCCESS":
-                decision_label = "APPROVED"
-            remarks = decision_result.get("remarks")
-            status_code = 200
-            stage = "Decision Agent"
-            
-            # Extract confidence for DB
-            import re
-            match = re.search(r'(\d+\.\d+)%', remarks)
-            if match:
-                confidence_score = float(match.group(1))
-            else:
-                confidence_score = 0.0
+            records = json.loads(body)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": f"Malformed batch body: {e}"})
 
-        # Save to DB
-        new_app = models.Application(
-            first_name=first_name,
-            last_name=last_name,
-            email=email,
-            annual_income=annual_income,
-            loan_amount=loan_amount,
-            credit_score=credit_score,
-            employment_status=employment_status,
-            housing_status=housing_status,
-            loan_term=loan_term,
-            status=decision_label.capitalize() if decision_label != "APPROVED" else "Approved",
-            confidence=confidence_score if 'confidence_score' in locals() else 0.0,
-            remarks=remarks
-        )
-        db.add(new_app)
-        db.commit()
-        
-        return JSONResponse(status_code=status_code, content={
-            "status": decision_label.capitalize() if decision_label != "APPROVED" else "Success",
-            "remarks": remarks,
-            "stage": stage,
-            "metrics": decision_result.get("metrics", {})
+    if not isinstance(records, list):
+        return JSONResponse(status_code=400, content={"error": "Expected a JSON array of applications."})
+    if len(records) > config.APPLY_BATCH_MAX_SIZE:
+        return JSONResponse(status_code=413, content={
+            "error": f"Batch of {len(records)} exceeds the limit of {config.APPLY_BATCH_MAX_SIZE} applications."
         })
 
+    timer = StageTimer("apply_batch")
+    # A whole batch takes one slot, like a single submission
+    if admission is not None:
+        try:
+            admitted_at = await admission.acquire("apply_batch")
+        except Rejected as e:
+            return shed_response(e, timer)
+    try:
+        with timer.stage("intake"):
+            intake = await intake_agent.process_batch(records)
+        with timer.stage("validation"):
+            validation = await validation_agent.validate_batch(intake)
+        with timer.stage("decision"):
+            decisions = await decision_agent.decide_batch(intake, validation)
+
+        results, rows = [], []
+        for i, (applicant, error, remarks, decision) in enumerate(
+                zip(intake["applicants"], intake["errors"], validation["remarks"], decisions)):
+            result, row = batch_outcome(error, remarks, decision)
+            results.append({"index": i, **result})
+            if error is not None:
+                # Could not be structured at all: reported back but not persisted, like a rejected form post
+                continue
+            rows.append({
+                **applicant,
+                **{name: cast(intake["financials"][name][i]) for name, cast in FINANCIAL_FIELDS},
+                **row
+            })
+
+        if rows:
+            # One executemany INSERT for the whole batch; ids come back in submission order
+            with timer.stage("db_insert"):
+                inserted = await db.execute(
+                    insert(models.Application).returning(models.Application.id, sort_by_parameter_order=True),
+                    rows
+                )
+                ids = inserted.scalars().all()
+                await analytics.record(db, [models.Application(**row) for row in rows])
+                await db.commit()
+
+            persisted = iter(zip(ids, rows))
+            applications = []
+            with timer.stage("publish"):
+                for result in results:
+                    if result["status_code"] == 422:
+                        continue
+                    app_id, row = next(persisted)
+                    result["application_id"] = app_id
+                    APPLICATIONS.inc("apply_batch", row["status"])
+                    application = models.Application(id=app_id, **row)
+                    applications.append(application)
+                    log_decision("apply_batch", application, result["status_code"], timer)
+                await publish_decisions(db, applications)
+
+        return JSONResponse(content={"results": results}, headers={"Server-Timing": timer.server_timing()})
+
     except Exception as e:
-        return JSONResponse(status_code=500, content={"error": str(e)})
+        return JSONResponse(status_code=500, content={"error": str(e)}, headers={"Server-Timing": timer.server_timing()})
+    finally:
+        if admission is not None:
+            admission.release(admitted_at)
@@ -0,0 +1,163 @@
+"""In-process latency metrics rendered in the Prometheus text exposition format, without extra dependencies.
+
+Observing a value is a bisect plus two additions, so stages can be timed on every request.
+"""
+import bisect
+import time
+from contextlib import contextmanager
+
+# Seconds; spans cache hits (sub-millisecond) to a cold model load
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Every metric created below, in registration order, for render()
+_METRICS = []
+
+
+def _label_text(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class _HistogramValues:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram:
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        if not self.labelnames:
+            self._children[()] = _HistogramValues(self.buckets)
+        _METRICS.append(self)
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = _HistogramValues(self.buckets)
+        return child
+
+    def observe(self, value):
+        self._children[()].observe(value)
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket{_label_text(self.labelnames, values, [('le', le)])} {cumulative}"
+            yield f"{self.name}_sum{_label_text(self.labelnames, values)} {child.sum}"
+            yield f"{self.name}_count{_label_text(self.labelnames, values)} {child.count}"
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        _METRICS.append(self)
+
+    def inc(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for values, total in self._values.items():
+            yield f"{self.name}{_label_text(self.labelnames, values)} {total}"
+
+
+class GaugeFunction:
+    """Gauge whose value is read from a callback at scrape time, so it costs nothing on the request path."""
+
+    def __init__(self, name, documentation, fn):
+        self.name = name
+        self.documentation = documentation
+        self.fn = fn
+        _METRICS.append(self)
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {self.fn()}"
+
+
+def render():
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+STAGE_SECONDS = Histogram(
+    "loan_stage_seconds", "Time spent in each stage of handling an application.", labelnames=("endpoint", "stage")
+)
+MODEL_BATCH_SECONDS = Histogram("loan_model_batch_seconds", "Decision Agent ensemble time per scored batch.")
+MODEL_BATCH_SIZE = Histogram(
+    "loan_model_batch_size", "Rows per Decision Agent scoring batch.", buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+)
+MODEL_QUEUE_WAIT_SECONDS = Histogram(
+    "loan_model_queue_wait_seconds", "Time a row waits in the micro-batcher before its batch starts scoring."
+)
+GROUP_COMMIT_SECONDS = Histogram("loan_group_commit_seconds", "Time to execute and commit one group of coalesced writes.")
+GROUP_COMMIT_SIZE = Histogram(
+    "loan_group_commit_size", "Writes per group commit.", buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+)
+IDEMPOTENT_REPLAYS = Counter("loan_idempotent_replays_total",
+                             "Duplicate /api/apply requests answered without rerunning the pipeline, by where the "
+                             "stored response came from.", labelnames=("source",))
+APPLICATIONS = Counter("loan_applications_total", "Applications finalized, by endpoint and status.",
+                       labelnames=("endpoint", "status"))
+ADMISSION_QUEUED = Counter("loan_admission_queued_total",
+                           "Submissions that waited for a pipeline slot, by endpoint.", labelnames=("endpoint",))
+ADMISSION_REJECTED = Counter("loan_admission_rejected_total",
+                             "Submissions turned away by admission control, by endpoint and reason (queue_full: 429, "
+                             "overloaded / timeout: 503).", labelnames=("endpoint", "reason"))
+ADMISSION_WAIT_SECONDS = Histogram("loan_admission_wait_seconds",
+                                   "Time admitted submissions waited for a pipeline slot.", labelnames=("endpoint",))
+
+
+class StageTimer:
+    """Per-request stage durations, recorded in STAGE_SECONDS and reported as a Server-Timing header."""
+
+    __slots__ = ("endpoint", "stages", "started")
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.stages = []
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.stages.append((name, elapsed))
+            STAGE_SECONDS.labels(self.endpoint, name).observe(elapsed)
+
+    def server_timing(self):
+        total = time.perf_counter() - self.started
+        STAGE_SECONDS.labels(self.endpoint, "total").observe(total)
+        stages = self.stages + [("total", total)]
+        return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in stages)
@@ -0,0 +1,56 @@
+"""One-off migration: collapse the duplicate rows written by the old double-INSERT apply_loan.
+
+Before the single-write lifecycle every application produced a "Processing" row followed by a second row
+carrying the final status. This removes each "Processing" row that has a finalized twin with identical
+application fields, keeping the finalized row (the id the dashboard already shows).
+
+Usage: python migrate_collapse_duplicates.py [--dry-run]
+"""
+import sys
+from collections import defaultdict
+
+from database import SessionLocal
+import models
+
+FIELDS = ("first_name", "last_name", "email", "annual_income", "loan_amount", "credit_score",
+          "employment_status", "housing_status", "loan_term")
+
+
+def collapse_duplicates(db, dry_run=False):
+    apps = db.query(models.Application).order_by(models.Application.id).all()
+
+    # Finalized rows waiting to be paired, grouped by their application fields
+    finalized = defaultdict(list)
+    for app in apps:
+        if app.status != models.PROCESSING:
+            finalized[tuple(getattr(app, f) for f in FIELDS)].append(app.id)
+
+    duplicates, orphans = [], []
+    for app in apps:
+        if app.status != models.PROCESSING:
+            continue
+        # The twin is the first later finalized row with the same fields
+        candidates = finalized[tuple(getattr(app, f) for f in FIELDS)]
+        twin = next((i for i in candidates if i > app.id), None)
+        if twin is None:
+            orphans.append(app.id)
+        else:
+            candidates.remove(twin)
+            duplicates.append(app.id)
+
+    if duplicates and not dry_run:
+        db.query(models.Application).filter(models.Application.id.in_(duplicates)).delete(synchronize_session=False)
+        db.commit()
+    return duplicates, orphans
+
+
+if __name__ == "__main__":
+    dry_run = "--dry-run" in sys.argv
+    db = SessionLocal()
+    try:
+        duplicates, orphans = collapse_duplicates(db, dry_run=dry_run)
+    finally:
+        db.close()
+    print(f"{'Would remove' if dry_run else 'Removed'} {len(duplicates)} duplicate Processing rows.")
+    if orphans:
+        print(f"{len(orphans)} Processing rows have no finalized twin and were kept: {orphans}")
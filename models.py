@@ -1,6 +1,12 @@
 from sqlalchemy import Column, Integer, String, Float
 from database import Base
 
+# Application lifecycle: rows are inserted as Processing and finalized exactly once
+PROCESSING = "Processing"
+TRANSITIONS = {
+    PROCESSING: {"Approved", "Rejected", "Error"},
+}
+
 class Application(Base):
     __tablename__ = "applications"
 
@@ -16,6 +22,35 @@ class Application(Base):
     housing_status = Column(Integer)
     loan_term = Column(Integer)
     
-    status = Column(String) # Approved, Rejected, Error
+    status = Column(String, index=True) # Processing, Approved, Rejected, Error
     confidence = Column(Float) # Percentage 0-100
     remarks = Column(String)
+    model_version = Column(String, index=True) # Decision model registry version that scored the application
+
+    # Deduplicates retried submissions: Idempotency-Key header or form content hash, plus the response to replay
+    idempotency_key = Column(String, unique=True, index=True)
+    response = Column(String) # JSON {"status_code", "content"}, stored only for keyed applications
+
+    def transition(self, status, confidence=0.0, remarks="", model_version=None):
+        """Move the application to its next lifecycle status; persisted as a single UPDATE on commit."""
+        if status not in TRANSITIONS.get(self.status, ()):
+            raise ValueError(f"Invalid status transition for application {self.id}: {self.status} -> {status}")
+        self.status = status
+        self.confidence = confidence
+        self.remarks = remarks
+        self.model_version = model_version
+
+
+class ApplicationRollup(Base):
+    """Pre-aggregated application counts per reporting dimension bucket, maintained by analytics.record()."""
+    __tablename__ = "application_rollup"
+
+    dimension = Column(String, primary_key=True) # e.g. credit_score_band, dti_bucket, overall
+    bucket = Column(String, primary_key=True)
+
+    applications = Column(Integer, nullable=False, default=0)
+    approved = Column(Integer, nullable=False, default=0)
+    rejected = Column(Integer, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)
+    scored = Column(Integer, nullable=False, default=0) # decisions made by the model (confidence > 0)
+    confidence_sum = Column(Float, nullable=False, default=0.0)
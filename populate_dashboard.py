@@ -1,3 +1,4 @@
+import argparse
 import requests
 import random
 import time
@@ -5,60 +6,66 @@ from faker import Faker
 
 fake = Faker()
 API_URL = "http://127.0.0.1:8000/api/apply"
+BATCH_API_URL = "http://127.0.0.1:8000/api/apply/batch"
 
-def generate_and_submit(count=118):
+def generate_application():
+    # Generate realistic data
+    first_name = fake.first_name()
+    last_name = fake.last_name()
+    email = f"{first_name.lower()}.{last_name.lower()}@example.com"
+    
+    # Mix of good, bad, and borderline profiles
+    profile_type = random.choices(['excellent', 'good', 'risky', 'poor'], weights=[20, 40, 30, 10])[0]
+    
+    if profile_type == 'excellent':
+        annual_income = random.randint(80000, 250000)
+        loan_amount = random.randint(5000, 30000)
+        credit_score = random.randint(720, 850)
+        employment_status = 2  # Employed
+        housing_status = 2     # Own
+    elif profile_type == 'good':
+        annual_income = random.randint(50000, 100000)
+        loan_amount = random.randint(5000, 20000)
+        credit_score = random.randint(650, 750)
+        employment_status = random.choice([1, 2]) # Self-emp or Employed
+        housing_status = random.choice([1, 2])    # Rent or Own
+    elif profile_type == 'risky':
+        annual_income = random.randint(30000, 60000)
+        loan_amount = random.randint(15000, 40000) # High DTI
+        credit_score = random.randint(580, 680)
+        employment_status = random.choice([0, 1, 2])
+        housing_status = random.choice([0, 1])
+    else:
+        annual_income = random.randint(20000, 40000)
+        loan_amount = random.randint(10000, 30000)
+        credit_score = random.randint(300, 580)
+        employment_status = random.choice([0, 1])
+        housing_status = random.choice([0, 1])
+
+    loan_term = random.choice([12, 24, 36, 48, 60])
+    
+    return {
+        "first_name": first_name,
+        "last_name": last_name,
+        "email": email,
+        "annual_income": annual_income,
+        "loan_amount": loan_amount,
+        "credit_score": credit_score,
+        "employment_status": employment_status,
+        "housing_status": housing_status,
+        "loan_term": loan_term
+    }
+
+def generate_and_submit(count=118, delay=0.1):
     print(f"Starting submission of {count} dummy applications...")
     
     success_count = 0
     fail_count = 0
+    started = time.perf_counter()
     
     for i in range(count):
-        # Generate realistic data
-        first_name = fake.first_name()
-        last_name = fake.last_name()
-        email = f"{first_name.lower()}.{last_name.lower()}@example.com"
-        
-        # Mix of good, bad, and borderline profiles
-        profile_type = random.choices(['excellent', 'good', 'risky', 'poor'], weights=[20, 40, 30, 10])[0]
-        
-        if profile_type == 'excellent':
-            annual_income = random.randint(80000, 250000)
-            loan_amount = random.randint(5000, 30000)
-            credit_score = random.randint(720, 850)
-            employment_status = 2  # Employed
-            housing_status = 2     # Own
-        elif profile_type == 'good':
-            annual_income = random.randint(50000, 100000)
-            loan_amount = random.randint(5000, 20000)
-            credit_score = random.randint(650, 750)
-            employment_status = random.choice([1, 2]) # Self-emp or Employed
-            housing_status = random.choice([1, 2])    # Rent or Own
-        elif profile_type == 'risky':
-            annual_income = random.randint(30000, 60000)
-            loan_amount = random.randint(15000, 40000) # High DTI
-            credit_score = random.randint(580, 680)
-            employment_status = random.choice([0, 1, 2])
-            housing_status = random.choice([0, 1])
-        else:
-            annual_income = random.randint(20000, 40000)
-            loan_amount = random.randint(10000, 30000)
-            credit_score = random.randint(300, 580)
-            employment_status = random.choice([0, 1])
-            housing_status = random.choice([0, 1])
-
-        loan_term = random.choice([12, 24, 36, 48, 60])
-        
-        data = {
-            "first_name": first_name,
-            "last_name": last_name,
-            "email": email,
-            "annual_income": annual_income,
-            "loan_amount": loan_amount,
-            "credit_score": credit_score,
-            "employment_status": employment_status,
-            "housing_status": housing_status,
-            "loan_term": loan_term
-        }
+        data = generate_application()
+        first_name, last_name = data["first_name"], data["last_name"]
         
         try:
             response = requests.post(API_URL, data=data)
@@ -74,9 +81,50 @@ def generate_and_submit(count=118):
             fail_count += 1
             print(f"[{i+1}/{count}] Request failed: {e}")
             
-        time.sleep(0.1) # Small delay to not overwhelm the local server completely
+        time.sleep(delay) # Small delay to not overwhelm the local server completely
         
+    elapsed = time.perf_counter() - started
+    print(f"\nCompleted! {success_count} succeeded, {fail_count} failed to submit.")
+    print(f"{count} applications in {elapsed:.2f}s ({count / elapsed:.1f} applications/s)")
+
+def generate_and_submit_batch(count=118, batch_size=100):
+    print(f"Starting batch submission of {count} dummy applications ({batch_size} per request)...")
+    
+    success_count = 0
+    fail_count = 0
+    started = time.perf_counter()
+    
+    for offset in range(0, count, batch_size):
+        batch = [generate_application() for _ in range(min(batch_size, count - offset))]
+        try:
+            response = requests.post(BATCH_API_URL, json=batch)
+            if response.status_code == 200:
+                for result in response.json()["results"]:
+                    if result["status_code"] in [200, 400]: # 400 is normally validation reject, which is fine
+                        success_count += 1
+                    else:
+                        fail_count += 1
+                print(f"[{offset + len(batch)}/{count}] batch accepted")
+            else:
+                fail_count += len(batch)
+                print(f"[{offset + len(batch)}/{count}] Error {response.status_code}")
+        except Exception as e:
+            fail_count += len(batch)
+            print(f"[{offset + len(batch)}/{count}] Request failed: {e}")
+    
+    elapsed = time.perf_counter() - started
     print(f"\nCompleted! {success_count} succeeded, {fail_count} failed to submit.")
+    print(f"{count} applications in {elapsed:.2f}s ({count / elapsed:.1f} applications/s)")
 
 if __name__ == "__main__":
-    generate_and_submit(118)
+    parser = argparse.ArgumentParser(description="Submit dummy loan applications to the local server.")
+    parser.add_argument("--count", type=int, default=118)
+    parser.add_argument("--batch", action="store_true", help="Use POST /api/apply/batch instead of one request per application")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--delay", type=float, default=0.1, help="Seconds to sleep between single submissions")
+    args = parser.parse_args()
+
+    if args.batch:
+        generate_and_submit_batch(args.count, args.batch_size)
+    else:
+        generate_and_submit(args.count, args.delay)
@@ -0,0 +1,116 @@
+"""Replay logged decision events through the Validation and Decision Agents for offline regression checks.
+
+Streams the segments written by event_log.py in batches, re-decides each application with the active model (or
+--version from the registry) and reports how many outcomes and confidences changed against what was served, plus
+replay throughput next to the decision-stage latency recorded live.
+
+Usage:
+    python replay_decisions.py decision_log/
+    python replay_decisions.py decision_log/ --version 20260101-120000-abcd1234 --scorer compiled --show 20
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+from itertools import islice
+
+import numpy as np
+
+from agents.decision_agent import DecisionAgent, FEATURE_COLUMNS
+from agents.validation_agent import ValidationAgent
+from event_log import read_events
+
+
+def batches(events, size):
+    events = iter(events)
+    while batch := list(islice(events, size)):
+        yield batch
+
+
+def replayed_outcome(decision):
+    """(status, confidence) the way /api/apply would have stored this decision."""
+    if decision is None:
+        return "Rejected", 0.0
+    return decision.application_status, decision.confidence
+
+
+async def replay(path, version, scorer, batch_size, limit, show):
+    agent = DecisionAgent(lazy=True, scorer=scorer, cache_size=0, shadow_version="", version=version)
+    await agent.start()
+    if not agent.ready:
+        raise SystemExit(f"Decision model not available: {agent.error or agent.state}")
+    validation_agent = ValidationAgent()
+
+    transitions = Counter()
+    served_versions = Counter()
+    live_decision_ms = []
+    replay_seconds = 0.0
+    events_seen = replayed = changed = 0
+    confidence_diffs = []
+
+    events = read_events(path)
+    if limit:
+        events = islice(events, limit)
+    for batch in batches(events, batch_size):
+        events_seen += len(batch)
+        # Errors were never decided, so there is nothing to compare against
+        batch = [event for event in batch if event["status"] != "Error"]
+        if not batch:
+            continue
+        matrix = np.array([event["features"] for event in batch], dtype=np.float64)
+        intake = {
+            "financials": {column: matrix[:, i] for i, column in enumerate(FEATURE_COLUMNS)},
+            "errors": [None] * len(batch),
+        }
+
+        started = time.perf_counter()
+        validation = await validation_agent.validate_batch(intake)
+        decisions = await agent.decide_batch(intake, validation)
+        replay_seconds += time.perf_counter() - started
+
+        for event, decision in zip(batch, decisions):
+            replayed += 1
+            served_versions[event.get("model_version")] += 1
+            if "decision" in event.get("stages_ms", {}):
+                live_decision_ms.append(event["stages_ms"]["decision"])
+            status, confidence = replayed_outcome(decision)
+            transitions[(event["status"], status)] += 1
+            if event["confidence"] and confidence:
+                confidence_diffs.append(abs(confidence - event["confidence"]))
+            if status != event["status"]:
+                changed += 1
+                if changed <= show:
+                    print(f"  application {event['application_id']}: {event['status']} -> {status} "
+                          f"(confidence {event['confidence']:.1f} -> {confidence:.1f}, features {event['features']})")
+    agent.shutdown()
+
+    print(f"Replayed {replayed:,} of {events_seen:,} logged decisions with model {agent.model_version}")
+    print(f"  served by: {', '.join(f'{v} ({n:,})' for v, n in served_versions.most_common())}")
+    if replayed:
+        print(f"  outcome changed: {changed:,} ({changed / replayed:.2%})")
+        for (before, after), n in sorted(transitions.items()):
+            print(f"    {before:>8} -> {after:<8} {n:,}")
+    if confidence_diffs:
+        print(f"  confidence |diff|: mean {np.mean(confidence_diffs):.3f}, max {np.max(confidence_diffs):.3f} points")
+    if replay_seconds:
+        print(f"  replay: {replayed / replay_seconds:,.0f} decisions/s in batches of {batch_size}")
+    if live_decision_ms:
+        print(f"  live decision stage: p50 {np.percentile(live_decision_ms, 50):.3f} ms, "
+              f"p99 {np.percentile(live_decision_ms, 99):.3f} ms per request")
+    return changed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-decide logged applications and compare with what was served.")
+    parser.add_argument("path", help="Decision log directory or a single .ndjson.gz segment")
+    parser.add_argument("--version", help="Registry model version to replay against (default: the active one)")
+    parser.add_argument("--scorer", choices=["sklearn", "compiled"], default="sklearn")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Events decided per model call")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many events (0 = all)")
+    parser.add_argument("--show", type=int, default=10, help="Print up to this many changed decisions")
+    parser.add_argument("--fail-on-change", action="store_true", help="Exit 1 if any outcome changed")
+    args = parser.parse_args()
+
+    changed = asyncio.run(replay(args.path, args.version, args.scorer, args.batch_size, args.limit, args.show))
+    if args.fail_on_change and changed:
+        raise SystemExit(1)
@@ -0,0 +1,160 @@
+"""Offline bulk scoring of loan portfolios shaped like loan_data.csv.
+
+Streams the input in chunks, applies the Validation Agent rules and the Decision Agent ensemble to each
+chunk, and appends decisions to the output as it goes, so memory stays bounded by the chunk size no
+matter how large the file is.
+
+Usage:
+    python score_portfolio.py loan_data.csv decisions.csv
+    python score_portfolio.py portfolio.parquet decisions.parquet --chunksize 200000 --workers 4
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from agents.decision_agent import FEATURE_COLUMNS, MODEL_PATH, COMPILED_MODEL_PATH, load_model, score_matrix, batch_metrics
+from agents.validation_agent import check_columns
+
+# Model loaded once per process (the main process when --workers 1)
+_model = None
+
+
+def _init_model(model_path):
+    global _model
+    _model = load_model(model_path)
+
+
+def score_chunk(chunk):
+    """Validate and score one DataFrame chunk, returning it with decision columns appended."""
+    missing = [column for column in FEATURE_COLUMNS if column not in chunk.columns]
+    if missing:
+        raise ValueError(f"Input is missing required columns: {', '.join(missing)}")
+
+    features = chunk[FEATURE_COLUMNS].apply(pd.to_numeric, errors="coerce")
+    matrix = features.to_numpy(dtype=np.float64)
+    unreadable = np.isnan(matrix).any(axis=1)
+
+    is_valid, remarks = check_columns({column: matrix[:, i] for i, column in enumerate(FEATURE_COLUMNS)})
+    is_valid &= ~unreadable
+    for i in np.flatnonzero(unreadable):
+        remarks[i] = "Unreadable or missing feature values."
+
+    n = len(chunk)
+    out = chunk.copy()
+    out["status"] = "Rejected"
+    for column in ("confidence", "dti_score", "credit_score_norm", "employment_score"):
+        out[column] = np.nan
+    out["remarks"] = remarks
+
+    valid = np.flatnonzero(is_valid)
+    if valid.size:
+        labels, probabilities = score_matrix(_model, matrix[valid])
+        metrics = batch_metrics(matrix[valid], labels, probabilities)
+        status = np.full(n, "Rejected", dtype=object)
+        status[valid] = np.where(metrics["approved"], "Approved", "Rejected")
+        out["status"] = status
+        for column, key in (("confidence", "confidence"), ("dti_score", "dti_score"),
+                            ("credit_score_norm", "credit_score"), ("employment_score", "employment_score")):
+            values = np.full(n, np.nan)
+            values[valid] = np.round(metrics[key], 2)
+            out[column] = values
+    return out
+
+
+def read_chunks(path, chunksize):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+class ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith(".parquet")
+        self._writer = None
+        self._wrote_header = False
+
+    def write(self, chunk):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            # A blank cell turns an integer column into float64 (a stray string, into object) in that chunk only,
+            # but the file has one schema: features are always written as float64, other columns are cast to the
+            # types of the first chunk
+            chunk = chunk.assign(**{
+                column: pd.to_numeric(chunk[column], errors="coerce").astype(np.float64)
+                for column in FEATURE_COLUMNS if column in chunk.columns
+            })
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                table = table.cast(self._writer.schema)
+            self._writer.write_table(table)
+        else:
+            chunk.to_csv(self.path, mode="a" if self._wrote_header else "w", header=not self._wrote_header, index=False)
+            self._wrote_header = True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def run(input_path, output_path, chunksize, workers, model_path):
+    writer = ChunkWriter(output_path)
+    rows = 0
+    started = time.perf_counter()
+
+    def report(chunk):
+        nonlocal rows
+        writer.write(chunk)
+        rows += len(chunk)
+        elapsed = time.perf_counter() - started
+        print(f"{rows:,} rows scored ({rows / elapsed:,.0f} rows/s)")
+
+    try:
+        if workers <= 1:
+            _init_model(model_path)
+            for chunk in read_chunks(input_path, chunksize):
+                report(score_chunk(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_model, initargs=(model_path,)) as pool:
+                # Keep at most two chunks per worker in flight so memory stays bounded; results are written in order
+                pending = deque()
+                for chunk in read_chunks(input_path, chunksize):
+                    pending.append(pool.submit(score_chunk, chunk))
+                    if len(pending) >= workers * 2:
+                        report(pending.popleft().result())
+                while pending:
+                    report(pending.popleft().result())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Done: {rows:,} rows in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:,.0f} rows/s) -> {output_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score a loan portfolio file with the Decision Agent ensemble.")
+    parser.add_argument("input", help="Input .csv or .parquet with the loan_data.csv feature columns")
+    parser.add_argument("output", help="Output .csv or .parquet for the decisions")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="Rows per chunk")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes scoring chunks in parallel")
+    parser.add_argument("--scorer", choices=["sklearn", "compiled"], default="sklearn",
+                        help="Score with loan_model.joblib or its compiled NumPy export")
+    args = parser.parse_args()
+
+    model_path = COMPILED_MODEL_PATH if args.scorer == "compiled" else MODEL_PATH
+    if not os.path.exists(model_path):
+        parser.error(f"Model file not found: {model_path}")
+    run(args.input, args.output, args.chunksize, args.workers, model_path)
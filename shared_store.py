@@ -0,0 +1,248 @@
+"""State that has to agree across API worker processes: dashboard counters, cached responses and dashboard events.
+
+SHARED_STORE_URL picks the backend:
+    memory://                 single process (default); nothing is shared
+    sqlite:///path/store.db   local file shared by every worker on one host (what gunicorn.conf.py uses)
+    redis://host:6379/0       Redis, for workers spread over several hosts (needs the redis package)
+
+Every backend offers the same small async API, made a handful of times per request. Nothing blocks the event loop:
+SQLite statements run on a thread of their own in each process, and wait at most SHARED_STORE_TIMEOUT_SECONDS for
+another worker's write lock before failing; Redis goes through redis.asyncio with the same timeout. Callers treat a failing
+store as a cache miss or a skipped dashboard update, never as a failed request.
+"""
+import asyncio
+import os
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+# Dashboard events kept for workers that poll them (events_since)
+EVENTS_KEEP = 1000
+
+
+class MemoryStore:
+    """In-process store for a single worker."""
+
+    shared = False
+
+    def __init__(self):
+        self._values = {}
+        self._expires = {}
+        self._events = deque(maxlen=EVENTS_KEEP)
+        self._event_seq = 0
+
+    async def get(self, key):
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.time():
+            self._values.pop(key, None)
+            self._expires.pop(key, None)
+        return self._values.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self._values[key] = value
+        if ttl:
+            self._expires[key] = time.time() + ttl
+        else:
+            self._expires.pop(key, None)
+
+    async def add(self, key, value, ttl=None):
+        """Set key only if it is absent (or expired); returns whether it was set."""
+        if await self.get(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def incr(self, key, amount=1):
+        self._values[key] = self._values.get(key, 0) + amount
+        return self._values[key]
+
+    async def counters(self, prefix):
+        return {key[len(prefix):]: value for key, value in self._values.items() if key.startswith(prefix)}
+
+    async def append_event(self, event_type, payload):
+        self._event_seq += 1
+        self._events.append((self._event_seq, os.getpid(), event_type, payload))
+
+    async def latest_cursor(self):
+        return self._event_seq
+
+    async def events_since(self, cursor):
+        events = [(origin, event_type, payload) for seq, origin, event_type, payload in self._events if seq > cursor]
+        return self._event_seq, events
+
+
+class SQLiteStore:
+    """Store in a local SQLite file (WAL), shared by all worker processes on the host."""
+
+    shared = True
+
+    def __init__(self, path, busy_timeout=config.SHARED_STORE_TIMEOUT_SECONDS):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._conn = None
+        self._executor = None
+        self._pid = None
+        self._writes = 0
+
+    async def _run(self, operation, *args):
+        # One thread and one connection per process, both made after the fork: neither survives it. The single
+        # thread also serializes every use of the connection.
+        if self._pid != os.getpid():
+            self._conn = None
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shared-store")
+            self._pid = os.getpid()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, operation, *args)
+
+    def _db(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value, expires_at REAL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS events (seq INTEGER PRIMARY KEY AUTOINCREMENT, origin INTEGER, "
+                "event_type TEXT, payload TEXT)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _wrote(self):
+        # Expired keys and old events are pruned every few hundred writes rather than on every call
+        self._writes += 1
+        if self._writes % 500 == 0:
+            db = self._db()
+            db.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+            db.execute("DELETE FROM events WHERE seq <= (SELECT MAX(seq) FROM events) - ?", (EVENTS_KEEP,))
+
+    async def get(self, key):
+        return await self._run(self._get, key)
+
+    def _get(self, key):
+        row = self._db().execute(
+            "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    async def set(self, key, value, ttl=None):
+        await self._run(self._set, key, value, ttl)
+
+    def _set(self, key, value, ttl):
+        self._db().execute("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)", (key, value, time.time() + ttl if ttl else None))
+        self._wrote()
+
+    async def add(self, key, value, ttl=None):
+        return await self._run(self._add, key, value, ttl)
+
+    def _add(self, key, value, ttl):
+        now = time.time()
+        cursor = self._db().execute(
+            "INSERT INTO kv VALUES (?, ?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
+            "expires_at = excluded.expires_at WHERE kv.expires_at IS NOT NULL AND kv.expires_at <= ?",
+            (key, value, now + ttl if ttl else None, now)
+        )
+        self._wrote()
+        return cursor.rowcount == 1
+
+    async def incr(self, key, amount=1):
+        return await self._run(self._incr, key, amount)
+
+    def _incr(self, key, amount):
+        row = self._db().execute(
+            "INSERT INTO kv VALUES (?, ?, NULL) ON CONFLICT(key) DO UPDATE SET value = value + excluded.value "
+            "RETURNING value", (key, amount)
+        ).fetchone()
+        return row[0]
+
+    async def counters(self, prefix):
+        return await self._run(self._counters, prefix)
+
+    def _counters(self, prefix):
+        # Range scan on the primary key instead of LIKE, so "_" and "%" in prefixes need no escaping
+        rows = self._db().execute("SELECT key, value FROM kv WHERE key >= ? AND key < ?", (prefix, prefix + "\uffff"))
+        return {key[len(prefix):]: value for key, value in rows}
+
+    async def append_event(self, event_type, payload):
+        await self._run(self._append_event, os.getpid(), event_type, payload)
+
+    def _append_event(self, origin, event_type, payload):
+        self._db().execute("INSERT INTO events (origin, event_type, payload) VALUES (?, ?, ?)",
+                           (origin, event_type, payload))
+        self._wrote()
+
+    async def latest_cursor(self):
+        return await self._run(self._latest_cursor)
+
+    def _latest_cursor(self):
+        return self._db().execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+
+    async def events_since(self, cursor):
+        return await self._run(self._events_since, cursor)
+
+    def _events_since(self, cursor):
+        rows = self._db().execute(
+            "SELECT seq, origin, event_type, payload FROM events WHERE seq > ? ORDER BY seq LIMIT 500", (cursor,)
+        ).fetchall()
+        if not rows:
+            return cursor, []
+        return rows[-1][0], [(origin, event_type, payload) for _, origin, event_type, payload in rows]
+
+
+class RedisStore:
+    """Redis-backed store for workers on several hosts; dashboard events go through a capped stream."""
+
+    shared = True
+    EVENTS_STREAM = "loan:dashboard-events"
+
+    def __init__(self, url, timeout=config.SHARED_STORE_TIMEOUT_SECONDS):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("SHARED_STORE_URL=redis://... needs the redis package (pip install redis)")
+        # Connections are only opened on first use, on the worker's own event loop, so none crosses the fork
+        self.client = redis.Redis.from_url(url, decode_responses=True, socket_timeout=timeout,
+                                           socket_connect_timeout=timeout)
+
+    async def get(self, key):
+        return await self.client.get(key)
+
+    async def set(self, key, value, ttl=None):
+        await self.client.set(key, value, px=int(ttl * 1000) if ttl else None)
+
+    async def add(self, key, value, ttl=None):
+        return bool(await self.client.set(key, value, nx=True, px=int(ttl * 1000) if ttl else None))
+
+    async def incr(self, key, amount=1):
+        return await self.client.incrby(key, amount)
+
+    async def counters(self, prefix):
+        keys = [key async for key in self.client.scan_iter(match=prefix + "*")]
+        values = await self.client.mget(keys) if keys else []
+        return {key[len(prefix):]: int(value) for key, value in zip(keys, values) if value is not None}
+
+    async def append_event(self, event_type, payload):
+        await self.client.xadd(self.EVENTS_STREAM, {"origin": os.getpid(), "type": event_type, "data": payload},
+                               maxlen=EVENTS_KEEP, approximate=True)
+
+    async def latest_cursor(self):
+        entries = await self.client.xrevrange(self.EVENTS_STREAM, count=1)
+        return entries[0][0] if entries else "0-0"
+
+    async def events_since(self, cursor):
+        result = await self.client.xread({self.EVENTS_STREAM: cursor}, count=500)
+        if not result:
+            return cursor, []
+        entries = result[0][1]
+        return entries[-1][0], [(int(fields["origin"]), fields["type"], fields["data"]) for _, fields in entries]
+
+
+def open_store(url):
+    if url.startswith("sqlite:///"):
+        return SQLiteStore(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://")):
+        return RedisStore(url)
+    if url in ("", "memory://"):
+        return MemoryStore()
+    raise ValueError(f"Unsupported SHARED_STORE_URL: {url!r} (expected memory://, sqlite:///path or redis://...)")
@@ -10,6 +10,10 @@ document.addEventListener('DOMContentLoaded', () => {
 
     const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
 
+    // Async mode: how often and for how long a queued application's status is polled
+    const POLL_INTERVAL_MS = 500;
+    const POLL_TIMEOUT_MS = 120000;
+
     const setStage = (stageId, status, message) => {
         const stage = document.getElementById(stageId);
         const p = stage.querySelector('p');
@@ -71,11 +75,35 @@ document.addEventListener('DOMContentLoaded', () => {
                 body: formData
             });
 
-            const data = await response.json();
+            let status = response.status;
+            let data = await response.json();
+
+            // Async mode: the application was queued (202), poll its status until the decision is stored
+            const statusUrl = data.status_url;
+            const pollDeadline = Date.now() + POLL_TIMEOUT_MS;
+            while (status === 202) {
+                if (Date.now() >= pollDeadline) {
+                    status = 504;
+                    data = { error: 'No decision yet. Your application is saved and still being processed.' };
+                    break;
+                }
+                await sleep(POLL_INTERVAL_MS);
+                const pollResponse = await fetch(statusUrl);
+                if (!pollResponse.ok) {
+                    status = pollResponse.status;
+                    data = { error: `Could not check the application status (HTTP ${status}).` };
+                    break;
+                }
+                const poll = await pollResponse.json();
+                if (poll.result) {
+                    status = poll.result.status_code;
+                    data = poll.result.content;
+                }
+            }
 
             await sleep(1500); // Visual agent delay
 
-            if (response.status === 400 && data.stage === "Validation Agent") {
+            if (status === 400 && data.stage === "Validation Agent") {
                 // Validation failed
                 setStage('stage-validation', 'error', 'Validation anomalies detected.');
                 showResult('rejected', data.status || 'Rejected', data.remarks, data.metrics);
@@ -87,7 +115,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
             await sleep(2000); // Visual agent delay
 
-            if (response.status !== 200) {
+            if (status !== 200) {
                 setStage('stage-decision', 'error', 'System Error.');
                 showResult('rejected', 'Error', 'An internal error occurred: ' + data.error);
                 return;
@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+from admission import AdmissionController, Rejected
+
+async def rejected(controller):
+    try:
+        await controller.acquire("apply")
+    except Rejected as e:
+        return e
+    raise AssertionError("submission was admitted")
+
+async def test():
+    # Test queue full: one running, one waiting, the next gets 429 with a Retry-After
+    controller = AdmissionController(max_concurrency=1, max_queued=1, queue_timeout=5, target_p99_ms=0)
+    started = await controller.acquire("apply")
+    waiter = asyncio.ensure_future(controller.acquire("apply"))
+    await asyncio.sleep(0)
+    assert controller.active == 1 and controller.waiting == 1
+    full = await rejected(controller)
+    assert full.status_code == 429 and full.reason == "queue_full" and full.retry_after >= 1
+    # The slot goes straight to the waiting submission
+    controller.release(started)
+    controller.release(await waiter)
+    assert controller.active == 0 and controller.waiting == 0 and controller.admitted == 2
+    print("Queue Full:", full.status_code, full.retry_after)
+
+    # Test queue timeout: a submission still waiting after queue_timeout gets 503 and leaves the queue
+    controller = AdmissionController(max_concurrency=1, max_queued=4, queue_timeout=0.05, target_p99_ms=0)
+    started = await controller.acquire("apply")
+    timed_out = await rejected(controller)
+    assert timed_out.status_code == 503 and timed_out.reason == "timeout" and controller.waiting == 0
+    controller.release(started)
+    assert controller.active == 0
+    print("Queue Timeout:", timed_out.status_code, controller.rejected)
+
+    # Test shedding: once p99 is above target, submissions that would have to wait get 503 at once
+    controller = AdmissionController(max_concurrency=1, max_queued=4, queue_timeout=5, target_p99_ms=10)
+    for _ in range(20):
+        controller.release(await controller.acquire("apply") - 0.05)
+    assert controller.overloaded and controller.p99 > 0.01
+    started = await controller.acquire("apply")  # a free slot is still taken
+    shed_at = time.perf_counter()
+    shed = await rejected(controller)
+    assert shed.status_code == 503 and shed.reason == "overloaded" and controller.waiting == 0
+    assert time.perf_counter() - shed_at < 0.05
+    controller.release(started)
+    print("Overload Shedding:", shed.status_code, shed.retry_after)
+
+asyncio.run(test())
+print("Admission tested successfully.")
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import joblib
+import numpy as np
+import pandas as pd
+
+from agents.compiled_model import CompiledEnsemble, export_ensemble
+from agents.decision_agent import FEATURE_COLUMNS, load_model
+from agents.explainer import TreeExplainer
+
+
+def test_compiled_model_matches_joblib():
+    model = joblib.load("loan_model.joblib")
+    with tempfile.TemporaryDirectory() as tmp:
+        compiled = CompiledEnsemble.load(export_ensemble(model, os.path.join(tmp, "compiled.npz")))
+
+    # Training data plus random and boundary profiles outside its range
+    rng = np.random.default_rng(0)
+    X = pd.concat([
+        pd.read_csv("loan_data.csv")[FEATURE_COLUMNS],
+        pd.DataFrame({
+            "annual_income": rng.uniform(1, 1_000_000, 2000),
+            "loan_amount": rng.uniform(1, 500_000, 2000),
+            "credit_score": rng.integers(300, 851, 2000),
+            "employment_status": rng.integers(0, 3, 2000),
+            "housing_status": rng.integers(0, 3, 2000),
+            "loan_term": rng.choice([12, 36, 60], 2000),
+        }),
+    ], ignore_index=True)
+
+    expected = model.predict_proba(X)
+    actual = compiled.predict_proba(X.to_numpy(dtype=np.float64))
+
+    assert np.abs(expected - actual).max() < 1e-9
+    assert (model.predict(X) == compiled.predict(X.to_numpy(dtype=np.float64))).all()
+
+
+def test_explanations_add_up_to_probability():
+    model = load_model("loan_model.joblib")
+    explainer = TreeExplainer.for_model(model, FEATURE_COLUMNS)
+    X = pd.read_csv("loan_data.csv")[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+
+    contributions = explainer.explain(X)
+    expected = model.predict_proba(X)[:, 1]
+
+    assert contributions.shape == X.shape
+    assert np.abs(explainer.base_value + contributions.sum(axis=1) - expected).max() < 1e-9
+
+
+if __name__ == "__main__":
+    test_compiled_model_matches_joblib()
+    test_explanations_add_up_to_probability()
+    print("Compiled model parity tested successfully.")
@@ -0,0 +1,112 @@
+import asyncio
+import os
+
+from benchmarks.common import scratch_database
+
+FORM = {
+    "first_name": "Jane", "last_name": "Doe", "email": "jane@dt.com", "annual_income": "150000",
+    "loan_amount": "10000", "credit_score": "750", "employment_status": "2", "housing_status": "2", "loan_term": "12"
+}
+
+async def test(main):
+    import httpx
+    from sqlalchemy import func, select
+    import models
+    from admission import AdmissionController
+
+    async def count(key):
+        async with main.AsyncSessionLocal() as db:
+            return (await db.execute(
+                select(func.count()).where(models.Application.idempotency_key == f"key:{key}")
+            )).scalar()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        # Test header replay: the retry gets the stored response and creates no second application
+        first = await client.post("/api/apply", data=FORM, headers={"Idempotency-Key": "replay-1"})
+        retry = await client.post("/api/apply", data=FORM, headers={"Idempotency-Key": "replay-1"})
+        assert first.status_code == retry.status_code == 200
+        assert retry.headers["Idempotent-Replayed"] == "true" and retry.json() == first.json()
+        assert await count("replay-1") == 1
+        print("Header Replay:", first.json()["status"])
+
+        # Test key reuse: another form under a used key gets 422, from memory and from the database alike
+        other = dict(FORM, loan_amount="20000")
+        reused = await client.post("/api/apply", data=other, headers={"Idempotency-Key": "replay-1"})
+        index = main.idempotency_index
+        main.idempotency_index = main.IdempotencyIndex()
+        try:
+            reused_db = await client.post("/api/apply", data=other, headers={"Idempotency-Key": "replay-1"})
+            replayed_db = await client.post("/api/apply", data=FORM, headers={"Idempotency-Key": "replay-1"})
+        finally:
+            main.idempotency_index = index
+        assert reused.status_code == reused_db.status_code == 422
+        assert "Idempotent-Replayed" not in reused.headers and "Idempotent-Replayed" not in reused_db.headers
+        assert replayed_db.headers["Idempotent-Replayed"] == "true" and replayed_db.json() == first.json()
+        assert await count("replay-1") == 1
+        print("Key Reuse:", reused.status_code, reused_db.status_code)
+
+        # Test in-flight sharing: concurrent duplicates wait for the first request instead of scoring again
+        responses = await asyncio.gather(*[
+            client.post("/api/apply", data=FORM, headers={"Idempotency-Key": "concurrent-1"}) for _ in range(3)
+        ])
+        assert [r.status_code for r in responses] == [200] * 3
+        assert all(r.json() == responses[0].json() for r in responses)
+        assert sum(r.headers.get("Idempotent-Replayed") == "true" for r in responses) == 2
+        assert await count("concurrent-1") == 1
+        print("In-flight Sharing:", [r.headers.get("Idempotent-Replayed") for r in responses])
+
+        # Test duplicates queued for admission: the first to get a slot runs, the others share its result
+        process, admission = main.intake_agent.process, main.admission
+
+        async def slow(**fields):
+            await asyncio.sleep(0.2)
+            return await process(**fields)
+
+        main.intake_agent.process = slow
+        main.admission = AdmissionController(max_concurrency=2, target_p99_ms=0)
+        try:
+            async def duplicate(delay):
+                await asyncio.sleep(delay)
+                return await client.post("/api/apply", data=FORM, headers={"Idempotency-Key": "queued-1"})
+
+            # Two slow requests hold both slots while the duplicates queue behind them
+            blockers = [
+                client.post("/api/apply", data=FORM, headers={"Idempotency-Key": f"blocker-{i}"}) for i in range(2)
+            ]
+            responses = (await asyncio.gather(*blockers, *[duplicate(0.05) for _ in range(3)]))[2:]
+        finally:
+            main.intake_agent.process, main.admission = process, admission
+        assert [r.status_code for r in responses] == [200] * 3
+        assert all(r.json() == responses[0].json() for r in responses)
+        assert await count("queued-1") == 1
+        print("Queued Duplicates:", [r.headers.get("Idempotent-Replayed") for r in responses])
+
+        # Test 500 release: a failed request frees its key, so the retry runs the pipeline again
+        process = main.intake_agent.process
+
+        async def failing(**fields):
+            raise RuntimeError("intake unavailable")
+
+        main.intake_agent.process = failing
+        try:
+            failed = await client.post("/api/apply", data=FORM, headers={"Idempotency-Key": "error-1"})
+        finally:
+            main.intake_agent.process = process
+        retry = await client.post("/api/apply", data=FORM, headers={"Idempotency-Key": "error-1"})
+        assert failed.status_code == 500 and retry.status_code == 200
+        assert "Idempotent-Replayed" not in retry.headers
+        assert await count("error-1") == 1
+        print("Error Release:", failed.json()["error"], "->", retry.json()["status"])
+
+        # Test no header: identical forms are separate applications unless IDEMPOTENCY_CONTENT_HASH=1
+        plain = [await client.post("/api/apply", data=FORM) for _ in range(2)]
+        assert [r.status_code for r in plain] == [200, 200]
+        assert not any("Idempotent-Replayed" in r.headers for r in plain)
+        print("No Header: two applications")
+
+with scratch_database():
+    os.environ["DECISION_LOG_DIR"] = ""
+    os.environ["MODEL_WATCH_SECONDS"] = "0"
+    import main
+    asyncio.run(test(main))
+print("Idempotency tested successfully.")
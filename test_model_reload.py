@@ -0,0 +1,44 @@
+import asyncio
+import datetime
+import os
+import shutil
+import tempfile
+
+from agents.decision_agent import DecisionAgent
+from agents.model_registry import ModelRegistry
+
+async def test(root):
+    registry = ModelRegistry(root=root)
+    good = registry.register("loan_model.joblib", "loan_model_compiled.npz", trained_at=datetime.datetime(2026, 1, 1))
+    other = registry.register("loan_model.joblib", "loan_model_compiled.npz", trained_at=datetime.datetime(2026, 1, 2),
+                              activate=False)
+    # A version whose model file cannot be loaded
+    broken = registry.register("loan_model.joblib", trained_at=datetime.datetime(2026, 1, 3), activate=False)
+    with open(broken["model_path"], "wb") as f:
+        f.truncate()
+
+    agent = DecisionAgent(registry=registry)
+    assert agent.active.version == good["version"]
+
+    # Test failed reload: the broken version is neither served nor made the active one
+    failure = None
+    try:
+        await agent.reload(broken["version"])
+    except Exception as e:
+        failure = e
+    assert failure is not None
+    print("Failed Reload:", type(failure).__name__)
+    assert registry.current() == good["version"] and agent.active.version == good["version"]
+
+    # Test successful reload: the version is served and activated
+    await agent.reload(other["version"])
+    assert registry.current() == other["version"] and agent.active.version == other["version"]
+    print("Reload:", registry.current())
+    agent.shutdown()
+
+root = tempfile.mkdtemp(prefix="loan-registry-")
+try:
+    asyncio.run(test(root))
+finally:
+    shutil.rmtree(root, ignore_errors=True)
+print("Model reload tested successfully.")
@@ -19,7 +19,8 @@ async def test():
     assert val['is_valid'] == True
     
     dec = await decision.decide(data, val)
-    print("Approval Case:", dec['status'], dec['remarks'])
+    assert dec.status == "Success" and "STABLE_EMPLOYMENT_HOUSING" in dec.reason_codes
+    print("Approval Case:", dec.status, dec.remarks)
 
     # Test reject case
     data2 = await intake.process(
@@ -29,7 +30,39 @@ async def test():
     )
     val2 = await validation.validate(data2)
     dec2 = await decision.decide(data2, val2)
-    print("Reject Case:", dec2['status'], dec2['remarks'])
+    assert dec2.status == "Rejected" and dec2.confidence > 50
+    print("Reject Case:", dec2.status, dec2.remarks)
+
+    # Test batch with non-finite or wrongly typed values: only the bad items are rejected by intake, the rest are scored
+    item = dict(first_name="Jane", last_name="Doe", email="jane@dt.com", annual_income=150000, loan_amount=10000,
+                credit_score=750, employment_status=2, housing_status=2, loan_term=12)
+    records = [item, dict(item, credit_score="nan"), dict(item, annual_income=float("nan")),
+               dict(item, loan_amount=float("1e400")), dict(item, first_name={"a": 1}), dict(item, credit_score=True)]
+    batch = await intake.process_batch(records)
+    assert batch["errors"][0] is None
+    assert all(error and error.startswith("Invalid value") for error in batch["errors"][1:])
+    val_batch = await validation.validate_batch(batch)
+    decisions = await decision.decide_batch(batch, val_batch)
+    assert decisions[0].status == "Success" and decisions[1:] == [None] * 5
+    print("Invalid Batch Items:", batch["errors"][1:])
+
+    # Test single and batched decisions agree, with contributions only when explaining
+    records = [dict(item, annual_income=income, loan_amount=amount, credit_score=score, employment_status=employment)
+               for income, amount, score, employment in [(150000, 10000, 750, 2), (25000, 80000, 400, 0),
+                                                         (60000, 30000, 680, 1), (90000, 5000, 720, 0)]]
+    batch = await intake.process_batch(records)
+    val_batch = await validation.validate_batch(batch)
+    explaining = DecisionAgent(explain=True)
+    for agent in (decision, explaining):
+        batched = await agent.decide_batch(batch, val_batch)
+        for record, batched_decision in zip(records, batched):
+            single = await agent.decide(await intake.process(**record), {"is_valid": True})
+            assert (single.status, single.remarks, single.metrics, single.reason_codes, single.contributions) == \
+                (batched_decision.status, batched_decision.remarks, batched_decision.metrics,
+                 batched_decision.reason_codes, batched_decision.contributions)
+            assert bool(single.contributions) == agent.explain
+    explaining.shutdown()
+    print("Single vs Batch:", [d.reason_codes for d in batched])
 
 asyncio.run(test())
 print("Pipeline tested successfully.")